@@ -1,19 +1,21 @@
 import os
 from backend.services.transcription.whisper_v3 import transcription_service
 
-async def generate_ai_captions(video_path: str, language: str = "en"):
+async def generate_ai_captions(video_path: str, language: str = "en", tier: str = "standard"):
     """
     Production Entry Point: Calls the isolated Whisper Large v3 infrastructure.
     Includes chunking, async transcription, and viral post-processing.
+    `tier` ("standard" / "premium") feeds the model routing policy.
     """
     try:
         # Transfer execution to the dedicated transcription service
-        result = await transcription_service.process_video(video_path, language)
+        result = await transcription_service.process_video(video_path, language, tier)
         
-        # If the high-accuracy service fails, we try once more as per requirements
+        # If the high-accuracy service fails, we try once more as per requirements.
+        # Finished chunks are checkpointed, so the retry only redoes the failed ones.
         if result.get("status") == "error":
             print(f"Retrying transcription for {video_path}...")
-            result = await transcription_service.process_video(video_path, language)
+            result = await transcription_service.process_video(video_path, language, tier)
             
         return result
         
@@ -21,8 +23,22 @@ async def generate_ai_captions(video_path: str, language: str = "en"):
         print(f"AI Service Bridge Error: {e}")
         return {"status": "error", "message": f"Critical AI Failure: {str(e)}"}
 
-async def export_video_render(video_path: str, segments: list, styles: dict):
+async def export_video_render(video_path: str, segments: list, styles: dict, profile: str = None):
     """
-    Renders video with burned-in subtitles.
+    Renders video with burned-in subtitles using the named encode profile.
     """
-    return await transcription_service.render_viral_video(video_path, segments, styles)
+    return await transcription_service.render_viral_video(video_path, segments, styles, profile)
+
+def regroup_captions(transcript_id: str, max_words: int = 4, pause_threshold: float = 0.3,
+                     punctuation: str = ".?!", emojis: bool = True):
+    """
+    Recomputes segments from a stored transcript without re-uploading or re-transcribing.
+    Raises KeyError if the transcript id is unknown.
+    """
+    return transcription_service.regroup(
+        transcript_id,
+        max_words=max_words,
+        pause_threshold=pause_threshold,
+        punctuation=tuple(punctuation),
+        emoji_rate=0.1 if emojis else 0.0
+    )
@@ -0,0 +1,120 @@
+"""
+Before/after benchmark for the caption word pipeline.
+
+Compares the legacy dict-per-word pipeline against the columnar WordTimeline
+on a synthetic transcript, reporting peak memory, wall time and payload size
+for each response encoding.
+
+Usage: python -m backend.bench_captions [--minutes 60]
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+import tracemalloc
+
+from backend.services.transcription.timeline import TimelineBuilder, VIRAL_EMOJIS
+from backend.services.transcription.caption_format import to_legacy, to_columnar, msgpack
+
+VOCAB = ["so", "this", "is", "how", "you", "grow", "your", "channel", "fast.", "really?",
+         "the", "algorithm", "loves", "watch", "time", "and", "hooks", "wow!", "every", "creator"]
+
+
+def synthetic_words(minutes: int, seed: int = 7):
+    """Yields (word, start, end) at roughly 2.5 words per second with occasional pauses."""
+    rng = random.Random(seed)
+    t = 0.0
+    limit = minutes * 60.0
+    while t < limit:
+        dur = rng.uniform(0.15, 0.45)
+        yield rng.choice(VOCAB), t, t + dur
+        t += dur + (rng.uniform(0.35, 0.8) if rng.random() < 0.08 else rng.uniform(0.0, 0.1))
+
+
+# ---------------- LEGACY (dict per word) ----------------
+def legacy_pipeline(raw):
+    words = [{"word": w, "start": round(s, 2), "end": round(e, 2)} for w, s, e in raw]
+
+    enhanced = []
+    for i, word_data in enumerate(words):
+        word = word_data["word"]
+        if i == 0 or words[i - 1]["word"].endswith(('.', '!', '?')):
+            word = word.capitalize()
+        if random.random() < 0.1:
+            word += f" {random.choice(VIRAL_EMOJIS)}"
+        enhanced.append({**word_data, "word": word})
+
+    segments, group = [], []
+    for i, word_data in enumerate(enhanced):
+        group.append(word_data)
+        brk = (len(group) >= 4
+               or any(p in word_data["word"] for p in ['.', '?', '!'])
+               or (i < len(enhanced) - 1 and enhanced[i + 1]["start"] - word_data["end"] > 0.3))
+        if brk or i == len(enhanced) - 1:
+            segments.append({
+                "start": round(group[0]["start"], 2),
+                "end": round(group[-1]["end"], 2),
+                "text": " ".join(w["word"] for w in group).strip()
+            })
+            group = []
+    if segments:
+        segments[0]["start"] = 0.0
+
+    return {
+        "status": "success",
+        "words": enhanced,
+        "segments": segments,
+        "full_text": " ".join(w["word"] for w in enhanced),
+    }
+
+
+# ---------------- COLUMNAR ----------------
+def columnar_pipeline(raw):
+    builder = TimelineBuilder()
+    for w, s, e in raw:
+        builder.append(w, s, e)
+    timeline = builder.build().capitalize_sentences().sprinkle_emojis(rate=0.1)
+    return {"status": "success", "words": timeline, "segments": timeline.group()}
+
+
+def measure(fn, raw):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(raw)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, default=60)
+    args = parser.parse_args()
+
+    raw = list(synthetic_words(args.minutes))
+    print(f"Synthetic transcript: {args.minutes} min, {len(raw):,} words\n")
+
+    legacy, legacy_t, legacy_peak = measure(legacy_pipeline, raw)
+    columnar, col_t, col_peak = measure(columnar_pipeline, raw)
+
+    print(f"{'pipeline':<12}{'time (ms)':>12}{'peak mem (MB)':>16}")
+    print(f"{'legacy':<12}{legacy_t * 1000:>12.1f}{legacy_peak / 1e6:>16.2f}")
+    print(f"{'columnar':<12}{col_t * 1000:>12.1f}{col_peak / 1e6:>16.2f}\n")
+
+    payloads = {
+        "json (legacy)": json.dumps(legacy).encode("utf-8"),
+        "json (timeline)": json.dumps(to_legacy(columnar)).encode("utf-8"),
+        "columnar json": json.dumps(to_columnar(columnar), separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+    }
+    if msgpack is not None:
+        payloads["msgpack"] = msgpack.packb(to_columnar(columnar), use_bin_type=True)
+
+    print(f"{'encoding':<18}{'raw (KB)':>12}{'gzip (KB)':>12}")
+    for name, body in payloads.items():
+        print(f"{name:<18}{len(body) / 1024:>12.1f}{len(gzip.compress(body, 6)) / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Encode profile benchmark for render_viral_video.
+
+Renders each reference clip with every encode profile and reports encode
+time, output size and throughput (x realtime and output fps). Without
+arguments a 30 s 1080x1920 synthetic reference clip is generated with FFmpeg.
+
+Usage: python -m backend.bench_encode [clip.mp4 ...] [--profiles fast balanced small]
+"""
+import os
+import time
+import asyncio
+import argparse
+
+from backend.services.transcription.whisper_v3 import transcription_service
+from backend.services.transcription.encode_profiles import ENCODE_PROFILES
+
+STYLES = {"font": "'Bebas Neue', cursive", "size": "48", "color": "#ffff00", "position": "bottom"}
+
+
+async def _run(cmd):
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, _ = await process.communicate()
+    return stdout.decode().strip()
+
+
+async def make_reference_clip(path: str, seconds: int = 30):
+    """Moving test pattern + tone; noisy enough that CRF/preset differences show."""
+    await _run([
+        'ffmpeg', '-y',
+        '-f', 'lavfi', '-i', f"testsrc2=size=1080x1920:rate=30:duration={seconds}",
+        '-f', 'lavfi', '-i', f"sine=frequency=440:duration={seconds}",
+        '-vf', "noise=alls=12:allf=t",
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18',
+        '-c:a', 'aac', '-shortest', path
+    ])
+
+
+async def probe(path: str):
+    out = await _run([
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'stream=nb_frames:format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1', path
+    ])
+    values = [v for v in out.split() if v != "N/A"]
+    frames = int(values[0]) if len(values) > 1 else 0
+    return float(values[-1]), frames
+
+
+def caption_segments(duration: float):
+    words = ["THIS", "IS", "HOW", "YOU", "GO", "VIRAL", "EVERY", "SINGLE", "TIME"]
+    segments, t, i = [], 0.0, 0
+    while t < duration:
+        segments.append({"start": t, "end": min(t + 1.2, duration), "text": " ".join(words[i % 9:i % 9 + 3])})
+        t += 1.2
+        i += 3
+    return segments
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="*")
+    parser.add_argument("--profiles", nargs="+", default=list(ENCODE_PROFILES), choices=list(ENCODE_PROFILES))
+    args = parser.parse_args()
+
+    clips, generated = args.clips, None
+    if not clips:
+        generated = "bench_reference.mp4"
+        await make_reference_clip(generated)
+        clips = [generated]
+
+    try:
+        print(f"{'clip':<24}{'profile':<10}{'time (s)':>10}{'size (MB)':>11}{'x realtime':>12}{'fps':>8}")
+        for clip in clips:
+            duration, _ = await probe(clip)
+            segments = caption_segments(duration)
+            for name in args.profiles:
+                t0 = time.perf_counter()
+                output = await transcription_service.render_viral_video(clip, segments, STYLES, name)
+                elapsed = time.perf_counter() - t0
+                _, frames = await probe(output)
+                size_mb = os.path.getsize(output) / 1e6
+                print(f"{os.path.basename(clip)[:23]:<24}{name:<10}{elapsed:>10.2f}{size_mb:>11.2f}"
+                      f"{duration / elapsed:>12.2f}{frames / elapsed:>8.1f}")
+                os.remove(output)
+    finally:
+        if generated and os.path.exists(generated):
+            os.remove(generated)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
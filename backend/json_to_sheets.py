@@ -1,6 +1,7 @@
+import asyncio
 from backend.sheets_service import SheetsDB, JSONDB
 
-def sync_json_to_google_sheet():
+async def sync_json_to_google_sheet():
     """Manual trigger to sync local data to Google Sheets"""
     sheets = SheetsDB()
     local = JSONDB()
@@ -14,7 +15,7 @@ def sync_json_to_google_sheet():
     # -------- Sync Users --------
     for user in data.get("users", []):
         email = user.get("email", user.get("gmail"))
-        result = sheets.store_user({
+        result = await sheets.store_user({
             "user_id": user.get("user_id"),
             "name": user.get("name"),
             "email": email,
@@ -26,7 +27,7 @@ def sync_json_to_google_sheet():
     # -------- Sync Feedback --------
     for fb in data.get("feedbacks", []):
         email = fb.get("email", fb.get("gmail"))
-        sheets.store_feedback({
+        await sheets.store_feedback({
             "user_id": fb.get("user_id", ""),
             "email": email,
             "rating": fb.get("rating"),
@@ -39,4 +40,4 @@ def sync_json_to_google_sheet():
     print("\n✅ End-to-end sync completed.")
 
 if __name__ == "__main__":
-    sync_json_to_google_sheet()
+    asyncio.run(sync_json_to_google_sheet())
@@ -1,16 +1,16 @@
 import os
 import uuid
 import json
+import asyncio
 import datetime
 from pathlib import Path
 from typing import Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, Field
 import uvicorn
 
 # --- Load environment ---
@@ -22,22 +22,27 @@ load_dotenv(ENV_PATH if ENV_PATH.exists() else None)
 app = FastAPI(title="codex7.ai")
 
 # --- Serve Frontend ---
+# Precompressed, content-hashed assets built once at startup
+from backend.static_assets import StaticAssets
+
 FRONTEND_DIR = BASE_DIR / "frontend"
+static_assets = StaticAssets(FRONTEND_DIR)
 
-app.mount(
-    "/static",
-    StaticFiles(directory=FRONTEND_DIR),
-    name="static"
-)
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"])
+def static_file(path: str, request: Request):
+    response = static_assets.asset(request, path)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return response
 
 @app.get("/")
-def root():
-    return FileResponse(FRONTEND_DIR / "index.html")
+def root(request: Request):
+    return static_assets.page(request, "index.html")
 
 
 @app.get("/editor")
-def editor():
-    return FileResponse(FRONTEND_DIR / "editor.html")
+def editor(request: Request):
+    return static_assets.page(request, "editor.html")
 
 # --- CORS ---
 app.add_middleware(
@@ -48,14 +53,22 @@ app.add_middleware(
 )
 
 # --- Internal services ---
-from backend.ai_service import generate_ai_captions, export_video_render
+from backend.ai_service import generate_ai_captions, export_video_render, regroup_captions
 from backend.sheets_service import SheetsDB, JSONDB
 from backend.services.analytics import analytics
+from backend.services.analytics_query import run_rollup, ROLLUPS
+from backend.services.transcription.caption_format import encode_caption_response
+from backend.services.uploads import uploads, UploadError
+from backend.services.transcription.encode_profiles import ENCODE_PROFILES, DEFAULT_PROFILE
 
 # --- Databases ---
 db = SheetsDB()
 local_db = JSONDB()
 
+@app.on_event("startup")
+async def start_analytics_compaction():
+    asyncio.create_task(analytics.run_compaction())
+
 # --- Models ---
 class UserLogin(BaseModel):
     name: str
@@ -70,6 +83,17 @@ class UserFeedback(BaseModel):
     feature: Optional[str] = "Editor"
     language_pref: Optional[str] = "en"
 
+class RegroupRequest(BaseModel):
+    transcript_id: str
+    max_words: int = Field(4, ge=1, le=20)
+    pause_threshold: float = Field(0.3, ge=0.0, le=10.0)
+    punctuation: str = ".?!"
+    emojis: bool = True
+
+class UploadCreate(BaseModel):
+    filename: str
+    size: int
+
 # ---------------- API ROUTES ----------------
 
 @app.post("/api/login")
@@ -80,7 +104,7 @@ async def login(user: UserLogin):
 
     user_id = user_result["user_id"]
 
-    db.store_user({
+    await db.store_user({
         "user_id": user_id,
         "name": user.name,
         "email": user.email,
@@ -92,16 +116,109 @@ async def login(user: UserLogin):
 @app.post("/api/feedback")
 async def submit_feedback(fb: UserFeedback):
     await analytics.log_event("USER_FEEDBACK", fb.dict())
-    db.store_feedback(fb.dict())
+    await db.store_feedback(fb.dict())
     local_db.store_feedback(fb.dict())
     return {"status": "success"}
 
+def _upload_http_error(e: UploadError) -> HTTPException:
+    headers = {"Upload-Offset": str(e.offset)} if e.offset is not None else None
+    return HTTPException(status_code=e.status_code, detail=str(e), headers=headers)
+
+def _resolve_upload(upload_id: str) -> str:
+    try:
+        return uploads.resolve(upload_id)
+    except UploadError as e:
+        raise _upload_http_error(e)
+
+@app.post("/api/uploads")
+async def create_upload(body: UploadCreate):
+    try:
+        return uploads.create(body.filename, body.size)
+    except UploadError as e:
+        raise _upload_http_error(e)
+
+@app.head("/api/uploads/{upload_id}")
+async def upload_offset(upload_id: str):
+    try:
+        status = uploads.status(upload_id)
+    except UploadError as e:
+        raise _upload_http_error(e)
+    return Response(headers={"Upload-Offset": str(status["offset"]), "Upload-Length": str(status["size"])})
+
+@app.get("/api/uploads/{upload_id}")
+async def upload_status(upload_id: str):
+    try:
+        return uploads.status(upload_id)
+    except UploadError as e:
+        raise _upload_http_error(e)
+
+@app.put("/api/uploads/{upload_id}")
+async def upload_part(upload_id: str, request: Request):
+    """
+    Appends one byte range. The start offset comes from `Content-Range: bytes a-b/total`
+    (or `Upload-Offset`); an optional `X-Part-SHA256` header is verified before commit.
+    """
+    content_range = request.headers.get("content-range")
+    try:
+        if content_range:
+            offset = int(content_range.split()[1].split("-")[0])
+        else:
+            offset = int(request.headers["upload-offset"])
+    except (IndexError, KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Content-Range or Upload-Offset header required")
+
+    try:
+        return await uploads.append(upload_id, offset, request.stream(), request.headers.get("x-part-sha256"))
+    except UploadError as e:
+        raise _upload_http_error(e)
+
+@app.post("/api/uploads/{upload_id}/finalize")
+async def finalize_upload(upload_id: str):
+    try:
+        return await uploads.finalize(upload_id)
+    except UploadError as e:
+        raise _upload_http_error(e)
+
+@app.delete("/api/uploads/{upload_id}")
+async def delete_upload(upload_id: str):
+    try:
+        await uploads.delete(upload_id)
+    except UploadError as e:
+        raise _upload_http_error(e)
+    return {"status": "success"}
+
+async def _log_caption_event(email: str, result: dict):
+    failed = result.get("status") == "error"
+    await analytics.log_event("CAPTION_ERROR" if failed else "CAPTION_GENERATED", {
+        "email": email,
+        "feature": "Captions",
+        "detected_language": result.get("language"),
+        "error_log": result.get("message") if failed else None
+    })
+
 @app.post("/api/generate-captions")
 async def generate(
-    video: UploadFile = File(...),
+    request: Request,
+    video: Optional[UploadFile] = File(None),
     email: str = Form(...),
-    language: str = Form("en")
+    language: str = Form("en"),
+    upload_id: Optional[str] = Form(None),
+    tier: str = Form("standard")
 ):
+    if upload_id:
+        # Finalized resumable upload: transcribe in place and keep it for export
+        source = _resolve_upload(upload_id)
+        result = await generate_ai_captions(source, language, tier)
+        await _log_caption_event(email, result)
+        return encode_caption_response(
+            result,
+            request.headers.get("accept"),
+            request.headers.get("accept-encoding")
+        )
+
+    if video is None:
+        raise HTTPException(status_code=422, detail="Provide either a video file or an upload_id")
+
     temp_file = f"temp_{uuid.uuid4()}_{video.filename}"
     content = await video.read()
 
@@ -109,17 +226,54 @@ async def generate(
         f.write(content)
 
     try:
-        result = await generate_ai_captions(temp_file, language)
+        result = await generate_ai_captions(temp_file, language, tier)
         os.remove(temp_file)
-        return result
+        await _log_caption_event(email, result)
+        return encode_caption_response(
+            result,
+            request.headers.get("accept"),
+            request.headers.get("accept-encoding")
+        )
     except Exception as e:
         if os.path.exists(temp_file):
             os.remove(temp_file)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/regroup-captions")
+async def regroup(req: RegroupRequest, request: Request):
+    try:
+        result = regroup_captions(
+            req.transcript_id,
+            max_words=req.max_words,
+            pause_threshold=req.pause_threshold,
+            punctuation=req.punctuation,
+            emojis=req.emojis
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return encode_caption_response(
+        result,
+        request.headers.get("accept"),
+        request.headers.get("accept-encoding")
+    )
+
+@app.get("/api/analytics/rollups/{rollup}")
+async def analytics_rollup(rollup: str, start: Optional[str] = None, end: Optional[str] = None):
+    """Rollups over compacted day partitions; `start`/`end` are YYYY-MM-DD."""
+    if rollup not in ROLLUPS:
+        raise HTTPException(status_code=404, detail=f"Unknown rollup. Choose one of: {', '.join(ROLLUPS)}")
+    for day in (start, end):
+        if day:
+            try:
+                datetime.date.fromisoformat(day)
+            except ValueError:
+                raise HTTPException(status_code=422, detail="start/end must be YYYY-MM-DD")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, run_rollup, rollup, start, end)
+
 @app.get("/api/history")
 async def history(email: str):
-    user = db.get_user_by_email(email)
+    user = await db.get_user_by_email(email)
     if not user:
         return []
     return local_db.get_user_history(user["user_id"])
@@ -127,20 +281,36 @@ async def history(email: str):
 @app.post("/api/export-video")
 async def export_video(
     background_tasks: BackgroundTasks,
-    video: UploadFile = File(...),
+    video: Optional[UploadFile] = File(None),
     segments: str = Form(...),
-    styles: str = Form(...)
+    styles: str = Form(...),
+    upload_id: Optional[str] = Form(None),
+    profile: str = Form(DEFAULT_PROFILE)
 ):
+    if profile not in ENCODE_PROFILES:
+        raise HTTPException(status_code=422, detail=f"Unknown profile. Choose one of: {', '.join(ENCODE_PROFILES)}")
+
+    segments_list = json.loads(segments)
+    styles_dict = json.loads(styles)
+
+    if upload_id:
+        output = await export_video_render(_resolve_upload(upload_id), segments_list, styles_dict, profile)
+        return FileResponse(
+            output,
+            media_type="video/mp4",
+            filename="codex7_export.mp4"
+        )
+
+    if video is None:
+        raise HTTPException(status_code=422, detail="Provide either a video file or an upload_id")
+
     temp_in = f"export_{uuid.uuid4()}.mp4"
     content = await video.read()
 
     with open(temp_in, "wb") as f:
         f.write(content)
 
-    segments_list = json.loads(segments)
-    styles_dict = json.loads(styles)
-
-    output = await export_video_render(temp_in, segments_list, styles_dict)
+    output = await export_video_render(temp_in, segments_list, styles_dict, profile)
 
     background_tasks.add_task(os.remove, temp_in)
 
@@ -1,29 +1,15 @@
 import os
-import json
 import asyncio
 import datetime
-from typing import Optional, Dict, Any
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from pathlib import Path
+from typing import Dict, Any
+
+from backend.services.google_client import google_api
+from backend.services.analytics_store import analytics_store
 
 class AnalyticsService:
     def __init__(self):
-        self.scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        
-        # Robust credentials path finding
-        # 1. Env Var
-        # 2. Same dir (unlikely for services/)
-        # 3. Backend dir (../credentials.json)
-        self.creds_path = os.getenv("GOOGLE_SHEETS_CREDS_PATH")
-        if not self.creds_path:
-             # Try determining relative to this file
-             base_dir = Path(__file__).resolve().parent.parent # backend/
-             possible_path = base_dir / "credentials.json"
-             if possible_path.exists():
-                 self.creds_path = str(possible_path)
-             else:
-                 self.creds_path = "credentials.json" # Fallback to CWD
+        # Credentials, session and thread pool are shared via google_api
+        self.creds_path = str(google_api.creds_path)
 
         # Support both singular and plural env var naming
         self.sheet_id = os.getenv("GOOGLE_SHEETS_ID") or os.getenv("GOOGLE_SHEET_ID")
@@ -31,27 +17,23 @@ class AnalyticsService:
         self.client = None
         self.sheet = None
         
-        # Local fallback path
-        self.fallback_path = Path("datastore/analytics_fallback.json")
-        if not self.fallback_path.exists():
-            self.fallback_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.fallback_path, "w") as f:
-                json.dump([], f)
+        # Local columnar store: every event is spooled here and compacted to Parquet
+        self.store = analytics_store
+        self.compact_interval = float(os.getenv("ANALYTICS_COMPACT_INTERVAL", "300"))
 
         self._initialize_client()
 
     def _initialize_client(self):
         try:
-            if os.path.exists(self.creds_path):
-                self.creds = ServiceAccountCredentials.from_json_keyfile_name(self.creds_path, self.scope)
-                self.client = gspread.authorize(self.creds)
+            if google_api.has_credentials():
+                self.client = google_api.run(google_api.gspread_client)
                 
                 if self.sheet_id:
-                    self.sheet = self.client.open_by_key(self.sheet_id).get_worksheet(0)
+                    self.sheet = google_api.run(lambda: self.client.open_by_key(self.sheet_id).get_worksheet(0))
                 else:
                     # Attempt to find by name if ID is missing
                     try:
-                        self.sheet = self.client.open("codex7_analytics").get_worksheet(0)
+                        self.sheet = google_api.run(lambda: self.client.open("codex7_analytics").get_worksheet(0))
                     except:
                         print("Analytics Sheet not found. Logging to fallback.")
         except Exception as e:
@@ -76,27 +58,37 @@ class AnalyticsService:
             data.get("error_log", "N/A")
         ]
 
-        # 1. Try Google Sheets
-        if self.sheet:
-            try:
-                self.sheet.append_row(row)
-                return
-            except Exception as e:
-                print(f"Sheets Logging Failed: {e}")
-
-        # 2. Fallback to Local JSON
+        # 1. Local store (always; source for rollup queries)
         try:
-            with open(self.fallback_path, "r") as f:
-                logs = json.load(f)
-            logs.append({
+            self.store.append({
                 "timestamp": timestamp,
                 "event_type": event_type,
                 **data
             })
-            with open(self.fallback_path, "w") as f:
-                json.dump(logs, f, indent=4)
         except Exception as e:
-            print(f"Fallback Logging Failed: {e}")
+            print(f"Local Analytics Logging Failed: {e}")
+
+        # 2. Google Sheets dashboard
+        if self.sheet:
+            try:
+                await google_api.call(self.sheet.append_row, row)
+            except Exception as e:
+                print(f"Sheets Logging Failed: {e}")
+
+    async def compact(self) -> int:
+        """Rotates the spool on the event loop, then writes Parquet off-loop."""
+        self.store.rotate()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.store.compact)
+
+    async def run_compaction(self):
+        """Background loop started with the app; compacts every `compact_interval` seconds."""
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                await self.compact()
+            except Exception as e:
+                print(f"Analytics Compaction Failed: {e}")
 
 # Global Instance
 analytics = AnalyticsService()
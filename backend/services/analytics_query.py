@@ -0,0 +1,66 @@
+from typing import Optional, Dict, Any, List
+
+import pandas as pd
+
+from backend.services.analytics_store import analytics_store, AnalyticsStore
+
+
+def _is_error(df: pd.DataFrame) -> pd.Series:
+    has_log = df["error_log"].notna() & ~df["error_log"].isin(["", "N/A"])
+    return df["event_type"].str.contains("ERROR", case=False, na=False) | has_log
+
+
+def events_per_hour(store: AnalyticsStore, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+    df = store.load(start, end, columns=["timestamp", "event_type"])
+    if df.empty:
+        return []
+    counts = (
+        df.groupby([df["timestamp"].dt.floor("h").rename("hour"), "event_type"])
+        .size()
+        .rename("count")
+        .reset_index()
+    )
+    counts["hour"] = counts["hour"].dt.strftime("%Y-%m-%dT%H:00")
+    return counts.to_dict(orient="records")
+
+
+def rating_by_feature(store: AnalyticsStore, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+    df = store.load(start, end, columns=["event_type", "feature", "rating"])
+    df = df[(df["event_type"] == "USER_FEEDBACK") & df["rating"].notna()]
+    if df.empty:
+        return []
+    stats = (
+        df.assign(feature=df["feature"].fillna("Unknown"))
+        .groupby("feature")["rating"]
+        .agg(avg_rating="mean", count="count")
+        .reset_index()
+    )
+    stats["avg_rating"] = stats["avg_rating"].round(2)
+    return stats.to_dict(orient="records")
+
+
+def error_rate(store: AnalyticsStore, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+    df = store.load(start, end, columns=["timestamp", "event_type", "error_log"])
+    if df.empty:
+        return []
+    stats = (
+        df.assign(day=df["timestamp"].dt.strftime("%Y-%m-%d"), error=_is_error(df))
+        .groupby("day")["error"]
+        .agg(errors="sum", events="count")
+        .reset_index()
+    )
+    stats["error_rate"] = (stats["errors"] / stats["events"]).round(4)
+    return stats.to_dict(orient="records")
+
+
+ROLLUPS = {
+    "events_per_hour": events_per_hour,
+    "rating_by_feature": rating_by_feature,
+    "error_rate": error_rate,
+}
+
+
+def run_rollup(name: str, start: Optional[str] = None, end: Optional[str] = None,
+               store: AnalyticsStore = analytics_store) -> List[Dict[str, Any]]:
+    """Runs a named rollup over the day partitions in [start, end]. Raises KeyError if unknown."""
+    return ROLLUPS[name](store, start, end)
@@ -0,0 +1,142 @@
+import os
+import json
+import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+_DEFAULT_DIR = Path(__file__).resolve().parents[2] / "datastore" / "analytics"
+
+# Fixed columns kept in Parquet; anything else in the event goes to `payload`
+EVENT_COLUMNS = ["timestamp", "event_type", "user_id", "feature", "rating", "detected_language", "error_log", "payload"]
+
+
+def _normalize(event: Dict[str, Any]) -> Dict[str, Any]:
+    data = dict(event)
+    row = {
+        "timestamp": data.pop("timestamp", None) or datetime.datetime.now().isoformat(),
+        "event_type": data.pop("event_type", "UNKNOWN"),
+        "user_id": str(data.pop("user_id", "anonymous") or "anonymous"),
+        "feature": data.pop("feature", None),
+        "rating": data.pop("rating", None),
+        "detected_language": data.pop("detected_language", None),
+        "error_log": data.pop("error_log", None),
+    }
+    try:
+        row["rating"] = float(row["rating"]) if row["rating"] not in (None, "", "N/A") else None
+    except (TypeError, ValueError):
+        row["rating"] = None
+    row["payload"] = json.dumps(data, default=str) if data else None
+    return row
+
+
+class AnalyticsStore:
+    """
+    Local analytics sink:
+      - `append` writes one JSON line to a per-day spool file (O(1) per event)
+      - `compact` folds spooled events into one Parquet file per day under
+        day=YYYY-MM-DD/, so queries read only the partitions they need
+
+    Call `rotate` and `append` from the same thread (the event loop); the
+    heavy `compact` work can then run on an executor.
+    """
+
+    def __init__(self, root: Path = _DEFAULT_DIR, legacy_path: Optional[Path] = None):
+        self.root = Path(root)
+        self.spool_dir = self.root / "spool"
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.legacy_path = legacy_path
+
+    # ---------------- WRITE PATH ----------------
+    def append(self, event: Dict[str, Any]):
+        row = _normalize(event)
+        path = self.spool_dir / f"events-{row['timestamp'][:10]}.jsonl"
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, default=str) + "\n")
+
+    def rotate(self) -> List[Path]:
+        """Moves active spool files aside so new events start fresh files."""
+        rotated = []
+        for path in self.spool_dir.glob("events-*.jsonl"):
+            target = path.with_name(f"{path.stem}.{datetime.datetime.now().strftime('%H%M%S%f')}.compacting")
+            os.replace(path, target)
+            rotated.append(target)
+        return rotated
+
+    # ---------------- COMPACTION ----------------
+    def partition_path(self, day: str) -> Path:
+        return self.root / f"day={day}" / "events.parquet"
+
+    def _legacy_events(self) -> List[Dict[str, Any]]:
+        """One-time import of the old single-array JSON fallback file."""
+        if not self.legacy_path or not self.legacy_path.exists():
+            return []
+        try:
+            with open(self.legacy_path, "r") as f:
+                events = json.load(f)
+        except Exception:
+            return []
+        return [_normalize(e) for e in events]
+
+    def _finish(self, files: List[Path]):
+        # Only drop inputs once every partition is safely written
+        for path in files:
+            path.unlink()
+        if self.legacy_path and self.legacy_path.exists():
+            os.replace(self.legacy_path, self.legacy_path.with_suffix(".imported.json"))
+
+    def compact(self) -> int:
+        """Folds all rotated spool files into day partitions. Returns events written."""
+        files = sorted(self.spool_dir.glob("*.compacting"))
+        rows = self._legacy_events()
+        for path in files:
+            with open(path, "r", encoding="utf-8") as f:
+                rows.extend(json.loads(line) for line in f if line.strip())
+        if not rows:
+            self._finish(files)
+            return 0
+
+        new = pd.DataFrame(rows, columns=EVENT_COLUMNS)
+        new["timestamp"] = pd.to_datetime(new["timestamp"], errors="coerce", format="ISO8601")
+        new = new.dropna(subset=["timestamp"])
+
+        # Every partition is written to a temp file before any is replaced, so a
+        # failure part-way leaves all partitions untouched and the spool files in
+        # place for the next run, instead of re-adding rows some days already absorbed
+        staged = []
+        try:
+            for day, part in new.groupby(new["timestamp"].dt.strftime("%Y-%m-%d")):
+                target = self.partition_path(day)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if target.exists():
+                    part = pd.concat([pd.read_parquet(target), part], ignore_index=True)
+                part = part.sort_values("timestamp", kind="stable")
+                tmp = target.with_suffix(".parquet.tmp")
+                staged.append((tmp, target))
+                part.to_parquet(tmp, index=False)
+        except Exception:
+            for tmp, _ in staged:
+                tmp.unlink(missing_ok=True)
+            raise
+
+        for tmp, target in staged:
+            os.replace(tmp, target)
+        self._finish(files)
+        return len(new)
+
+    # ---------------- READ PATH ----------------
+    def days(self) -> List[str]:
+        return sorted(p.name[4:] for p in self.root.glob("day=*") if (p / "events.parquet").exists())
+
+    def load(self, start: Optional[str] = None, end: Optional[str] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Reads only partitions within [start, end] (YYYY-MM-DD) and only `columns`."""
+        selected = [d for d in self.days() if (not start or d >= start) and (not end or d <= end)]
+        frames = [pd.read_parquet(self.partition_path(d), columns=columns) for d in selected]
+        if not frames:
+            return pd.DataFrame(columns=columns or EVENT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+
+analytics_store = AnalyticsStore(legacy_path=Path("datastore/analytics_fallback.json"))
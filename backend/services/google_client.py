@@ -0,0 +1,214 @@
+import os
+import time
+import asyncio
+import datetime
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+
+_backend_dir = Path(__file__).resolve().parent.parent
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling Google while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and fails fast for
+    `reset_timeout` seconds; then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._trial_in_flight):
+                raise CircuitOpenError("Google API circuit open; skipping call")
+            if state == "half-open":
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class GoogleAPIClient:
+    """
+    Process-wide Google API access shared by SheetsDB, AnalyticsService and the
+    maintenance scripts:
+      - one service-account credential and one authorized HTTP session
+        (keep-alive, pooled connections, default request timeout)
+      - proactive token refresh before expiry instead of a 401 round trip
+      - blocking gspread calls run on a bounded thread pool behind a timeout
+        and a circuit breaker, so a slow Sheets API never blocks the event loop
+    """
+
+    def __init__(self):
+        self.creds_path = self._find_credentials()
+        self.max_workers = int(os.getenv("GOOGLE_API_WORKERS", "4"))
+        self.timeout = float(os.getenv("GOOGLE_API_TIMEOUT", "10"))
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("GOOGLE_API_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("GOOGLE_API_BREAKER_RESET", "30")),
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="google-api")
+        # Cap queued work so a stalled API can't pile up unbounded requests
+        self._slots = threading.BoundedSemaphore(self.max_workers * 4)
+        self._auth_lock = threading.Lock()
+        self._creds = None
+        self._session = None
+        self._token_request = None
+        self._client = None
+
+    def _find_credentials(self) -> Path:
+        env_path = os.getenv("GOOGLE_SHEETS_CREDS_PATH") or os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+        candidates = [
+            Path(env_path) if env_path else None,
+            Path("/etc/secrets/credentials.json"),
+            _backend_dir / "credentials.json",
+            Path("credentials.json"),
+        ]
+        for path in candidates:
+            if path and path.exists():
+                return path
+        return Path(env_path or "/etc/secrets/credentials.json")
+
+    def has_credentials(self) -> bool:
+        return self.creds_path.exists()
+
+    # ---------------- AUTH / SESSION ----------------
+    def _build_session(self):
+        import requests
+        from google.auth.transport.requests import AuthorizedSession, Request
+
+        default_timeout = self.timeout
+
+        class _Session(AuthorizedSession):
+            def request(self, method, url, *args, **kwargs):
+                # gspread passes timeout=None explicitly unless set_timeout was called
+                if kwargs.get("timeout") is None:
+                    kwargs["timeout"] = default_timeout
+                return super().request(method, url, *args, **kwargs)
+
+        # Token refreshes use a plain session; going through the authorized one
+        # would trigger a second, nested refresh for the token request itself
+        self._token_request = Request(requests.Session())
+        session = _Session(self._creds, auth_request=self._token_request)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.max_workers,
+            pool_maxsize=self.max_workers,
+            max_retries=2,
+        )
+        session.mount("https://", adapter)
+        return session
+
+    def _refresh_if_needed(self):
+        """Refreshes the token when it is missing or within 5 minutes of expiry."""
+        creds = self._creds
+        expiry = creds.expiry
+        if creds.token is None or expiry is None or expiry - datetime.datetime.utcnow() < datetime.timedelta(minutes=5):
+            creds.refresh(self._token_request)
+
+    def gspread_client(self):
+        """
+        Returns the shared gspread client, authorizing on first use.
+        Blocking: call from inside `run`/`call`, or at startup.
+        """
+        with self._auth_lock:
+            if self._client is None:
+                import gspread
+                from google.oauth2.service_account import Credentials
+
+                if not self.has_credentials():
+                    raise FileNotFoundError(f"Google credentials not found at {self.creds_path}")
+
+                self._creds = Credentials.from_service_account_file(str(self.creds_path), scopes=SCOPES)
+                self._session = self._build_session()
+                # Same signature on gspread 5 and 6; the client reuses our pooled session
+                self._client = gspread.Client(self._creds, session=self._session)
+                self._refresh_if_needed()
+            return self._client
+
+    def _ensure_fresh(self):
+        if self._creds is not None:
+            with self._auth_lock:
+                self._refresh_if_needed()
+
+    # ---------------- EXECUTION ----------------
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Runs a blocking Google call through the breaker on the current thread."""
+        self.breaker.before_call()
+        try:
+            self._ensure_fresh()
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def call(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Awaitable version of `run` for the event loop: executes on the shared
+        thread pool and gives up after `timeout` seconds.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise CircuitOpenError("Google API queue full; skipping call")
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._slots.release()
+            raise
+
+        def _job():
+            try:
+                self._ensure_fresh()
+                return fn(*args, **kwargs)
+            finally:
+                self._slots.release()
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, _job),
+                timeout=timeout or self.timeout * 2
+            )
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+
+google_api = GoogleAPIClient()
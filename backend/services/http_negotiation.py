@@ -0,0 +1,25 @@
+from typing import Dict, Optional
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Parses Accept-Encoding into {coding: q}. A coding with q=0 is explicitly refused."""
+    accepted = {}
+    for part in (header or "").split(","):
+        pieces = part.strip().split(";")
+        name = pieces[0].strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in pieces[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def accepts_encoding(header: Optional[str], coding: str) -> bool:
+    return accepted_encodings(header).get(coding, 0) > 0
@@ -0,0 +1,99 @@
+import gzip
+import json
+from typing import Dict, Any, Optional
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response
+
+from backend.services.http_negotiation import accepts_encoding
+from backend.services.transcription.timeline import WordTimeline, SegmentTable
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for the MessagePack encoding
+    msgpack = None
+
+COLUMNAR_JSON = "application/vnd.codex7.captions+json"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+GZIP_MIN_BYTES = 1024
+
+
+def _ms(values: np.ndarray) -> list:
+    return np.rint(values * 1000).astype(np.int64).tolist()
+
+
+def to_legacy(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Row-oriented response shape consumed by the editor (words/segments/full_text)."""
+    timeline = result.get("words")
+    segments = result.get("segments")
+    if not isinstance(timeline, WordTimeline):
+        return result
+    payload = {k: v for k, v in result.items() if k not in ("words", "segments")}
+    payload["words"] = timeline.to_dicts()
+    payload["segments"] = segments.to_dicts() if isinstance(segments, SegmentTable) else segments
+    payload["full_text"] = timeline.full_text()
+    return payload
+
+
+def to_columnar(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compact shape: times as integer milliseconds, word text as indices into a
+    shared `texts` table. `full_text` is dropped since it is derivable from words.
+    """
+    timeline = result.get("words")
+    segments = result.get("segments")
+    if not isinstance(timeline, WordTimeline):
+        return result
+    # Transforms leave replaced strings in the text table; ship only the ones in use
+    timeline = timeline.compacted()
+    payload = {k: v for k, v in result.items() if k not in ("words", "segments")}
+    payload["format"] = "columnar-v1"
+    payload["texts"] = timeline.texts
+    payload["words"] = {
+        "start_ms": _ms(timeline.starts),
+        "end_ms": _ms(timeline.ends),
+        "text": timeline.text_ids.tolist(),
+    }
+    payload["segments"] = {
+        "start_ms": _ms(segments.starts),
+        "end_ms": _ms(segments.ends),
+        "text": segments.texts,
+    }
+    return payload
+
+
+def _accepts(header: str, media_type: str) -> bool:
+    return any(part.split(";")[0].strip().lower() == media_type for part in header.split(","))
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    accept = accept or ""
+    if msgpack is not None and any(_accepts(accept, t) for t in MSGPACK_TYPES):
+        return "msgpack"
+    if _accepts(accept, COLUMNAR_JSON):
+        return "columnar"
+    return "json"
+
+
+def encode_caption_response(result: Dict[str, Any], accept: Optional[str] = None,
+                            accept_encoding: Optional[str] = None) -> Response:
+    """
+    Picks the response encoding from the Accept header. Plain JSON stays the
+    default; the compact encodings are opt-in and gzip-compressed when allowed.
+    """
+    fmt = negotiate_format(accept)
+    # The body depends on Accept, so shared caches must key on it for every format
+    if fmt == "json":
+        return JSONResponse(to_legacy(result), headers={"Vary": "Accept"})
+
+    payload = to_columnar(result)
+    if fmt == "msgpack":
+        body, media_type = msgpack.packb(payload, use_bin_type=True), "application/msgpack"
+    else:
+        body, media_type = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), COLUMNAR_JSON
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and accepts_encoding(accept_encoding, "gzip"):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,65 @@
+import os
+import time
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from backend.services.transcription.timeline import WordTimeline
+
+_DEFAULT_DIR = Path(__file__).resolve().parents[3] / "datastore" / "checkpoints"
+
+
+class ChunkCheckpoints:
+    """
+    Per-chunk transcription results on disk, keyed by job (media fingerprint +
+    language/task/model). A retry or a restarted worker reuses finished chunks
+    and only transcribes the missing ones. Jobs untouched for `max_age_hours`
+    are pruned.
+    """
+
+    def __init__(self, root: Path = _DEFAULT_DIR, max_age_hours: float = 24):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age_hours * 3600
+
+    def job_key(self, media_key: str, **params) -> str:
+        spec = "|".join(f"{k}={params[k]}" for k in sorted(params))
+        return hashlib.sha1(f"{media_key}|{spec}".encode()).hexdigest()
+
+    def _chunk_path(self, job_key: str, start: float) -> Path:
+        return self.root / job_key / f"chunk_{int(start * 1000):012d}.npz"
+
+    def load(self, job_key: str, start: float) -> Optional[Dict[str, Any]]:
+        path = self._chunk_path(job_key, start)
+        if not path.exists():
+            return None
+        try:
+            timeline, meta = WordTimeline.load_npz(path)
+        except Exception:
+            # Truncated write from a crashed worker: redo the chunk
+            path.unlink()
+            return None
+        return {"words": timeline, **meta}
+
+    def save(self, job_key: str, start: float, result: Dict[str, Any]):
+        path = self._chunk_path(job_key, start)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"language": result["language"], "language_prob": result["language_prob"]}
+        # np.savez appends .npz to names without it, so keep the suffix on the temp file
+        tmp = path.with_name(f"{path.stem}.tmp.npz")
+        result["words"].save_npz(tmp, meta)
+        os.replace(tmp, path)
+
+    def clear(self, job_key: str):
+        shutil.rmtree(self.root / job_key, ignore_errors=True)
+        self.prune()
+
+    def prune(self):
+        cutoff = time.time() - self.max_age
+        for job_dir in self.root.iterdir():
+            if job_dir.is_dir() and job_dir.stat().st_mtime < cutoff:
+                shutil.rmtree(job_dir, ignore_errors=True)
+
+
+chunk_checkpoints = ChunkCheckpoints()
@@ -0,0 +1,49 @@
+import os
+from typing import Dict, Any, List
+
+# Named x264 encode profiles for render_viral_video.
+# Every profile outputs a fixed 9:16 canvas: the source is scaled to fit and
+# letterboxed/pillarboxed to width x height, then encoded as yuv420p. The same size
+# is written as the subtitle PlayResX/PlayResY so caption geometry maps 1:1 onto
+# output pixels.
+ENCODE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Quickest encode, largest files
+    "fast": {"preset": "ultrafast", "crf": 23, "tune": None, "width": 1080, "height": 1920},
+    # Default: several times smaller than ultrafast for a modest time cost
+    "balanced": {"preset": "veryfast", "crf": 24, "tune": "film", "width": 1080, "height": 1920},
+    # Smallest download: slower preset, higher CRF, 720p
+    "small": {"preset": "medium", "crf": 28, "tune": "film", "width": 720, "height": 1280},
+}
+DEFAULT_PROFILE = "balanced"
+
+
+def get_profile(name: str = None) -> Dict[str, Any]:
+    """Returns the named profile with the thread count resolved. Raises KeyError if unknown."""
+    profile = dict(ENCODE_PROFILES[name or DEFAULT_PROFILE])
+    # 0 lets x264 pick based on available cores
+    profile["threads"] = int(os.getenv("FFMPEG_THREADS", "0"))
+    return profile
+
+
+def video_filter(profile: Dict[str, Any], subtitles_path: str) -> str:
+    w, h = profile["width"], profile["height"]
+    return (
+        f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+        f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,"
+        f"setsar=1,"
+        f"subtitles='{subtitles_path}'"
+    )
+
+
+def encoder_args(profile: Dict[str, Any]) -> List[str]:
+    args = [
+        '-c:v', 'libx264',
+        '-preset', profile["preset"],
+        '-crf', str(profile["crf"]),
+        '-threads', str(profile["threads"]),
+        '-pix_fmt', 'yuv420p',
+        '-movflags', '+faststart',
+    ]
+    if profile.get("tune"):
+        args += ['-tune', profile["tune"]]
+    return args
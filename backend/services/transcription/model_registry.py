@@ -0,0 +1,99 @@
+import os
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+
+# Approximate resident size (MB) of each faster-whisper checkpoint once loaded
+MODEL_FOOTPRINT_MB = {
+    "tiny": 150, "tiny.en": 150,
+    "base": 250, "base.en": 250,
+    "small": 600, "small.en": 600,
+    "medium": 1600, "medium.en": 1600,
+    "large-v1": 3200, "large-v2": 3200, "large-v3": 3200, "large": 3200,
+    "distil-large-v3": 1700,
+}
+DEFAULT_FOOTPRINT_MB = 2000
+
+
+class ModelRegistry:
+    """
+    Loads faster-whisper models on demand and keeps them resident under a RAM
+    budget, evicting the least recently used model first. A model that alone
+    exceeds the budget is still loaded, after evicting everything else.
+
+    Eviction only drops the registry's reference; a transcription already
+    holding the model keeps it alive until it finishes. Loads run in the
+    default executor, and concurrent requests for the same size await one load.
+    """
+
+    def __init__(self, device: str, compute_type: str, budget_mb: int):
+        self.device = device
+        self.compute_type = compute_type
+        self.budget_mb = budget_mb
+        self._models: "OrderedDict[str, object]" = OrderedDict()
+        self._pending: "dict[str, asyncio.Future]" = {}
+
+    def footprint(self, size: str) -> int:
+        return MODEL_FOOTPRINT_MB.get(size, DEFAULT_FOOTPRINT_MB)
+
+    def resident_mb(self) -> int:
+        return sum(self.footprint(s) for s in self._models)
+
+    def loaded(self):
+        return list(self._models)
+
+    async def get(self, size: str):
+        if size in self._models:
+            self._models.move_to_end(size)
+            return self._models[size]
+
+        pending = self._pending.get(size)
+        if pending is None:
+            pending = asyncio.ensure_future(self._load(size))
+            self._pending[size] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(size, None))
+        # Shielded so one cancelled caller doesn't abort the load for the others
+        return await asyncio.shield(pending)
+
+    async def _load(self, size: str):
+        # Loads still in flight count against the budget but can't be evicted
+        needed = sum(self.footprint(s) for s in self._pending) or self.footprint(size)
+        while self._models and self.resident_mb() + needed > self.budget_mb:
+            evicted, _ = self._models.popitem(last=False)
+            print(f"Evicting Whisper Model ({evicted}) to stay under {self.budget_mb} MB")
+
+        print(f"Loading Whisper Model ({size}) on {self.device}...")
+        loop = asyncio.get_running_loop()
+        model = await loop.run_in_executor(None, self._construct, size)
+        self._models[size] = model
+        return model
+
+    def _construct(self, size: str):
+        from faster_whisper import WhisperModel
+        return WhisperModel(size, device=self.device, compute_type=self.compute_type)
+
+
+class ModelRouter:
+    """
+    Picks a model size per job:
+      - premium tier or long audio  -> large
+      - non-English source language -> balanced (small models are weak off-English)
+      - short clips                 -> fast
+      - everything else             -> balanced
+    """
+
+    def __init__(self):
+        self.fast = os.getenv("WHISPER_MODEL_FAST", "base")
+        self.balanced = os.getenv("WHISPER_MODEL_BALANCED") or os.getenv("WHISPER_MODEL", "small")
+        self.large = os.getenv("WHISPER_MODEL_LARGE", "large-v3")
+        self.short_seconds = float(os.getenv("WHISPER_SHORT_AUDIO_SECONDS", "90"))
+        self.long_seconds = float(os.getenv("WHISPER_LONG_AUDIO_SECONDS", "900"))
+
+    def select(self, duration: float, language: Optional[str] = None, tier: str = "standard") -> str:
+        if tier == "premium" or duration >= self.long_seconds:
+            return self.large
+        if language and language not in ("en", "auto"):
+            return self.balanced
+        if duration <= self.short_seconds:
+            return self.fast
+        return self.balanced
@@ -0,0 +1,218 @@
+import json
+import random
+from array import array
+from typing import List, Dict, Any, Iterable, Optional
+
+import numpy as np
+
+SENTENCE_PUNCTUATION = ('.', '?', '!')
+VIRAL_EMOJIS = ["🔥", "✨", "🎯", "⚡", "🚀", "🙌", "💥", "🎬"]
+
+
+def new_emoji_seed() -> int:
+    """Seed stored with a transcript so emoji placement is stable across regroups."""
+    return random.getrandbits(32)
+
+
+class WordTimeline:
+    """
+    Columnar word store: parallel start/end arrays plus an interned text table.
+    Each word is a row index; its text lives once in `texts` and is referenced by `text_ids`.
+    """
+
+    def __init__(self, starts=None, ends=None, text_ids=None, texts: Optional[List[str]] = None):
+        self.starts = np.asarray(starts if starts is not None else [], dtype=np.float64)
+        self.ends = np.asarray(ends if ends is not None else [], dtype=np.float64)
+        self.text_ids = np.asarray(text_ids if text_ids is not None else [], dtype=np.int32)
+        self.texts = list(texts or [])
+        self._index = {t: i for i, t in enumerate(self.texts)}
+
+    def __len__(self):
+        return len(self.text_ids)
+
+    def intern(self, text: str) -> int:
+        idx = self._index.get(text)
+        if idx is None:
+            idx = len(self.texts)
+            self.texts.append(text)
+            self._index[text] = idx
+        return idx
+
+    # ---------------- BUILDING ----------------
+    @classmethod
+    def from_dicts(cls, words: Iterable[Dict[str, Any]]) -> "WordTimeline":
+        builder = TimelineBuilder()
+        for w in words:
+            builder.append(w["word"], w["start"], w["end"])
+        return builder.build()
+
+    @classmethod
+    def concat(cls, timelines: List["WordTimeline"]) -> "WordTimeline":
+        """Merges per-chunk timelines, re-interning each chunk's text table once."""
+        merged = cls()
+        starts, ends, ids = [], [], []
+        for tl in timelines:
+            if not len(tl):
+                continue
+            remap = np.fromiter((merged.intern(t) for t in tl.texts), dtype=np.int32, count=len(tl.texts))
+            starts.append(tl.starts)
+            ends.append(tl.ends)
+            ids.append(remap[tl.text_ids])
+        if ids:
+            merged.starts = np.concatenate(starts)
+            merged.ends = np.concatenate(ends)
+            merged.text_ids = np.concatenate(ids)
+        return merged
+
+    # ---------------- PERSISTENCE ----------------
+    def save_npz(self, path, meta: Optional[Dict[str, Any]] = None):
+        """Plain .npz (no pickle); `meta` is stored as a JSON string."""
+        np.savez(
+            path,
+            starts=self.starts,
+            ends=self.ends,
+            text_ids=self.text_ids,
+            texts=np.array(self.texts, dtype=str),
+            meta=np.array(json.dumps(meta or {})),
+        )
+
+    @classmethod
+    def load_npz(cls, path):
+        """Returns (timeline, meta) written by `save_npz`."""
+        with np.load(path, allow_pickle=False) as data:
+            timeline = cls(data["starts"], data["ends"], data["text_ids"], data["texts"].tolist())
+            meta = json.loads(str(data["meta"]))
+        return timeline, meta
+
+    # ---------------- VIEWS ----------------
+    def words(self) -> List[str]:
+        texts = self.texts
+        return [texts[i] for i in self.text_ids.tolist()]
+
+    def full_text(self) -> str:
+        return " ".join(self.words())
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Legacy row-oriented view: [{"word", "start", "end"}, ...]."""
+        return [
+            {"word": w, "start": s, "end": e}
+            for w, s, e in zip(self.words(), self.starts.tolist(), self.ends.tolist())
+        ]
+
+    def _text_mask(self, predicate) -> np.ndarray:
+        """Evaluates `predicate` once per distinct text and broadcasts it to every word."""
+        per_text = np.fromiter((predicate(t) for t in self.texts), dtype=bool, count=len(self.texts))
+        return per_text[self.text_ids] if len(self.texts) else np.zeros(len(self), dtype=bool)
+
+    def _remap(self, mask: np.ndarray, transform, keys: Optional[np.ndarray] = None) -> "WordTimeline":
+        """
+        Returns a new timeline where masked words are replaced by `transform(key)`.
+        `keys` defaults to the text ids; each distinct key is transformed and interned
+        once, into the copy, leaving this timeline untouched.
+        """
+        out = WordTimeline(self.starts, self.ends, self.text_ids.copy(), self.texts)
+        if mask.any():
+            keys = out.text_ids if keys is None else keys
+            uniq, inverse = np.unique(keys[mask], return_inverse=True)
+            mapped = np.fromiter((out.intern(transform(int(u))) for u in uniq), dtype=np.int32, count=len(uniq))
+            out.text_ids[mask] = mapped[inverse]
+        return out
+
+    def compacted(self) -> "WordTimeline":
+        """Copy whose text table holds only the strings referenced by a word."""
+        used, inverse = np.unique(self.text_ids, return_inverse=True)
+        texts = self.texts
+        return WordTimeline(self.starts, self.ends, inverse.reshape(-1).astype(np.int32),
+                            [texts[i] for i in used.tolist()])
+
+    # ---------------- TRANSFORMS ----------------
+    def capitalize_sentences(self) -> "WordTimeline":
+        """Capitalizes the first word and every word following sentence punctuation."""
+        n = len(self)
+        cap = np.zeros(n, dtype=bool)
+        if n:
+            cap[0] = True
+            cap[1:] = self._text_mask(lambda t: t.endswith(SENTENCE_PUNCTUATION))[:-1]
+        texts = self.texts
+        return self._remap(cap, lambda i: texts[i].capitalize())
+
+    def sprinkle_emojis(self, rate: float = 0.1, emojis: List[str] = VIRAL_EMOJIS, seed: Optional[int] = None) -> "WordTimeline":
+        n = len(self)
+        k = len(emojis)
+        rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
+        mask = rng.random(n) < rate
+        # Pack (text, emoji) into one key so each distinct pair is interned once
+        keys = self.text_ids.astype(np.int64) * k + rng.integers(k, size=n)
+        texts = self.texts
+        return self._remap(mask, lambda key: f"{texts[key // k]} {emojis[key % k]}", keys)
+
+    def group(self, max_words: int = 4, pause_threshold: float = 0.3,
+              break_punctuation=SENTENCE_PUNCTUATION) -> "SegmentTable":
+        """
+        Vectorized viral grouping. A group closes on sentence punctuation, on a
+        pause longer than `pause_threshold`, or after `max_words` words.
+        """
+        n = len(self)
+        if not n:
+            return SegmentTable()
+
+        soft = self._text_mask(lambda t: any(p in t for p in break_punctuation))
+        soft[:-1] |= (self.starts[1:] - self.ends[:-1]) > pause_threshold
+        soft[-1] = True
+
+        # Position of each word within its soft run; the word cap splits runs evenly
+        run_starts = np.concatenate(([0], np.flatnonzero(soft[:-1]) + 1))
+        run_id = np.cumsum(np.concatenate(([0], soft[:-1].astype(np.int64))))
+        pos = np.arange(n) - run_starts[run_id]
+        breaks = soft | ((pos % max_words) == max_words - 1)
+
+        group_ends = np.flatnonzero(breaks)
+        group_starts = np.concatenate(([0], group_ends[:-1] + 1))
+
+        words = self.words()
+        seg_texts = [" ".join(words[a:b + 1]).strip() for a, b in zip(group_starts.tolist(), group_ends.tolist())]
+        seg_starts = np.round(self.starts[group_starts], 2)
+        seg_ends = np.round(self.ends[group_ends], 2)
+
+        # Zero-delay rule
+        seg_starts[0] = 0.0
+        return SegmentTable(seg_starts, seg_ends, seg_texts)
+
+
+class TimelineBuilder:
+    """Append-only builder backed by typed arrays, so no per-word dicts are created."""
+
+    def __init__(self, offset: float = 0.0):
+        self.offset = offset
+        self._starts = array('d')
+        self._ends = array('d')
+        self._ids = array('i')
+        self._timeline = WordTimeline()
+
+    def append(self, word: str, start: float, end: float):
+        self._starts.append(round(start + self.offset, 2))
+        self._ends.append(round(end + self.offset, 2))
+        self._ids.append(self._timeline.intern(word))
+
+    def build(self) -> WordTimeline:
+        tl = self._timeline
+        tl.starts = np.frombuffer(self._starts, dtype=np.float64).copy()
+        tl.ends = np.frombuffer(self._ends, dtype=np.float64).copy()
+        tl.text_ids = np.frombuffer(self._ids, dtype=np.int32).copy()
+        return tl
+
+
+class SegmentTable:
+    def __init__(self, starts=None, ends=None, texts: Optional[List[str]] = None):
+        self.starts = np.asarray(starts if starts is not None else [], dtype=np.float64)
+        self.ends = np.asarray(ends if ends is not None else [], dtype=np.float64)
+        self.texts = list(texts or [])
+
+    def __len__(self):
+        return len(self.texts)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [
+            {"start": s, "end": e, "text": t}
+            for s, e, t in zip(self.starts.tolist(), self.ends.tolist(), self.texts)
+        ]
@@ -0,0 +1,75 @@
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from backend.services.transcription.timeline import WordTimeline
+
+_DEFAULT_DIR = Path(__file__).resolve().parents[3] / "datastore" / "transcripts"
+
+
+class TranscriptStore:
+    """
+    Persists raw (pre post-processing) word timelines under a transcript id so
+    captions can be regrouped or restyled without re-uploading the video.
+    Files are plain .npz; a small LRU keeps recently used transcripts in memory.
+    Transcripts untouched for `max_age_hours` are pruned.
+    """
+
+    def __init__(self, root: Path = _DEFAULT_DIR, cache_size: int = 32, max_age_hours: float = 7 * 24):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size
+        self.max_age = max_age_hours * 3600
+        self._cache: "OrderedDict[str, Tuple[WordTimeline, Dict[str, Any]]]" = OrderedDict()
+
+    def _path(self, transcript_id: str) -> Path:
+        # Ids are generated by us; reject anything that could escape the store dir
+        if not transcript_id or not all(c in "0123456789abcdef" for c in transcript_id):
+            raise KeyError(transcript_id)
+        return self.root / f"{transcript_id}.npz"
+
+    def _remember(self, transcript_id: str, entry):
+        self._cache[transcript_id] = entry
+        self._cache.move_to_end(transcript_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def save(self, timeline: WordTimeline, meta: Optional[Dict[str, Any]] = None) -> str:
+        transcript_id = uuid.uuid4().hex
+        meta = meta or {}
+        timeline.save_npz(self._path(transcript_id), meta)
+        self._remember(transcript_id, (timeline, meta))
+        self.prune()
+        return transcript_id
+
+    def prune(self):
+        cutoff = time.time() - self.max_age
+        for path in self.root.glob("*.npz"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    self._cache.pop(path.stem, None)
+            except FileNotFoundError:
+                pass
+
+    def load(self, transcript_id: str) -> Tuple[WordTimeline, Dict[str, Any]]:
+        """Returns (raw timeline, metadata). Raises KeyError for unknown ids."""
+        path = self._path(transcript_id)
+        if not path.exists():
+            self._cache.pop(transcript_id, None)
+            raise KeyError(transcript_id)
+        # Regrouping keeps a transcript alive for another retention window
+        path.touch()
+
+        if transcript_id in self._cache:
+            self._cache.move_to_end(transcript_id)
+            return self._cache[transcript_id]
+
+        entry = WordTimeline.load_npz(path)
+        self._remember(transcript_id, entry)
+        return entry
+
+
+transcript_store = TranscriptStore()
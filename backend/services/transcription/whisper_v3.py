@@ -3,31 +3,44 @@ import subprocess
 import uuid
 import asyncio
 import re
-import random
 import json
-from typing import List, Dict, Any
+import wave
+import hashlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import numpy as np
 from dotenv import load_dotenv
 import static_ffmpeg
 
+from backend.services.transcription.timeline import WordTimeline, TimelineBuilder, SegmentTable, SENTENCE_PUNCTUATION, new_emoji_seed
+from backend.services.transcription.transcript_store import transcript_store
+from backend.services.transcription.model_registry import ModelRegistry, ModelRouter
+from backend.services.transcription.encode_profiles import get_profile, video_filter, encoder_args
+from backend.services.transcription.checkpoints import chunk_checkpoints
+
 load_dotenv()
 
 class WhisperLargeV3Service:
     def __init__(self):
-        self.model_size = os.getenv("WHISPER_MODEL", "base") # Default to base for stability
         self.device = "cuda" if os.getenv("USE_GPU", "false").lower() == "true" else "cpu"
         self.compute_type = "float16" if self.device == "cuda" else "int8"
-        self.model = None # Lazy load
+        # Models load lazily per size and stay resident under the RAM budget
+        self.models = ModelRegistry(
+            self.device, self.compute_type,
+            budget_mb=int(os.getenv("WHISPER_RAM_BUDGET_MB", "4096"))
+        )
+        self.router = ModelRouter()
+        self.chunk_length = 30
+        self.chunk_retries = int(os.getenv("WHISPER_CHUNK_RETRIES", "2"))
+        self.model_size = self.router.balanced # Default when no routing input is available
+        self._language_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict() # media key -> detection
         
         # Ensure FFmpeg is available on Windows
         print("Ensuring FFmpeg infrastructure is ready...")
         static_ffmpeg.add_paths()
         
-    def _load_model(self):
-        if self.model is None:
-            print(f"Loading Whisper Model ({self.model_size}) on {self.device}...")
-            from faster_whisper import WhisperModel
-            self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
-        return self.model
+    async def _load_model(self, model_size: str = None):
+        return await self.models.get(model_size or self.model_size)
 
     async def preprocess_audio(self, video_path: str) -> str:
         """
@@ -67,14 +80,19 @@ class WhisperLargeV3Service:
         stdout, _ = await process.communicate()
         return float(stdout.decode().strip())
 
-    async def chunk_audio_ffmpeg(self, audio_path: str, chunk_length: int = 30) -> List[str]:
+    async def chunk_audio_ffmpeg(self, audio_path: str, chunk_length: int = 30, duration: float = None,
+                                 starts: List[int] = None) -> List[str]:
         """
         Splits audio into 30s chunks using FFmpeg.
+        `starts` limits cutting to those offsets (e.g. chunks missing a checkpoint).
         """
-        duration = await self.get_audio_duration(audio_path)
+        if starts is None:
+            if duration is None:
+                duration = await self.get_audio_duration(audio_path)
+            starts = list(range(0, int(duration), chunk_length))
         chunks = []
         
-        for start_time in range(0, int(duration), chunk_length):
+        for start_time in starts:
             chunk_path = f"{audio_path}_chunk_{start_time}.wav"
             cmd = [
                 'ffmpeg', '-y', '-ss', str(start_time), '-t', str(chunk_length),
@@ -89,11 +107,67 @@ class WhisperLargeV3Service:
             chunks.append(chunk_path)
         return chunks
 
-    async def transcribe_chunk(self, chunk_path: str, start_offset: float, language: str = None) -> Dict[str, Any]:
+    def media_key(self, path: str) -> str:
         """
-        Transcribes a single chunk with word-level timestamps and detects language.
+        Cheap content fingerprint (size + head + tail) so retries and re-uploads
+        of the same media share cached work without hashing the whole file.
         """
-        model = self._load_model()
+        size = os.path.getsize(path)
+        digest = hashlib.sha1(str(size).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read(1 << 20))
+            if size > 2 << 20:
+                f.seek(-(1 << 20), os.SEEK_END)
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def _read_pcm_window(self, audio_path: str, seconds: int):
+        """Reads the first `seconds` of the 16 kHz mono s16 WAV as float32 samples."""
+        with wave.open(audio_path, "rb") as wav:
+            frames = wav.readframes(wav.getframerate() * seconds)
+        return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+
+    async def detect_language(self, audio_path: str, window_seconds: int = 120,
+                              model_size: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Detects the spoken language once from the first speech-bearing window of
+        the decoded audio. VAD skips leading silence/music before detection.
+        Returns None if detection fails, leaving chunks to detect on their own.
+        """
+        model = await self._load_model(model_size)
+        loop = asyncio.get_event_loop()
+        try:
+            audio = self._read_pcm_window(audio_path, window_seconds)
+            # transcribe() detects language eagerly; the segment generator is never consumed
+            _, info = await loop.run_in_executor(
+                None,
+                lambda: model.transcribe(audio, language=None, vad_filter=True)
+            )
+            return {"language": info.language, "language_prob": info.language_probability}
+        except Exception as e:
+            print(f"Language pre-pass failed, falling back to per-chunk detection: {e}")
+            return None
+
+    async def _pinned_language(self, video_path: str, audio_path: str, model_size: str = None) -> Optional[Dict[str, Any]]:
+        key = self.media_key(video_path)
+        if key in self._language_cache:
+            self._language_cache.move_to_end(key)
+            return self._language_cache[key]
+
+        detection = await self.detect_language(audio_path, model_size=model_size)
+        if detection:
+            self._language_cache[key] = detection
+            while len(self._language_cache) > 256:
+                self._language_cache.popitem(last=False)
+        return detection
+
+    async def transcribe_chunk(self, chunk_path: str, start_offset: float, language: str = None,
+                               task: str = None, model_size: str = None) -> Dict[str, Any]:
+        """
+        Transcribes a single chunk with word-level timestamps.
+        Detects language only if none is pinned by the caller.
+        """
+        model = await self._load_model(model_size)
         loop = asyncio.get_event_loop()
         # VAD filter helps with alignment and avoids transcribing silence
         segments, info = await loop.run_in_executor(
@@ -102,101 +176,60 @@ class WhisperLargeV3Service:
                 chunk_path, 
                 word_timestamps=True,
                 beam_size=5,
-                task="translate" if language == "en" else "transcribe",
+                task=task or ("translate" if language == "en" else "transcribe"),
                 language=language if language and language != "auto" else None,
                 vad_filter=True,
                 initial_prompt=f"Capturing viral shorts audio. Clear {language if language else 'English'} captions."
             )
         )
         
-        chunk_words = []
-        chunk_segments = []
+        builder = TimelineBuilder(offset=start_offset)
         for segment in segments:
-            chunk_segments.append({
-                "start": round(segment.start + start_offset, 2),
-                "end": round(segment.end + start_offset, 2),
-                "text": segment.text.strip()
-            })
             if segment.words:
                 for word in segment.words:
-                    chunk_words.append({
-                        "word": word.word.strip(),
-                        "start": round(word.start + start_offset, 2),
-                        "end": round(word.end + start_offset, 2)
-                    })
+                    builder.append(word.word.strip(), word.start, word.end)
         
         if os.path.exists(chunk_path):
             try: os.remove(chunk_path)
             except: pass
             
         return {
-            "words": chunk_words,
-            "segments": chunk_segments,
+            "words": builder.build(),
             "language": info.language,
             "language_prob": info.language_probability
         }
 
-    def group_words_virally(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def group_words_virally(self, words: WordTimeline, max_words: int = 4, pause_threshold: float = 0.3,
+                            punctuation=SENTENCE_PUNCTUATION) -> SegmentTable:
         """
         STRICT 2-4 WORD GROUPING for viral shorts.
-        - Splits precisely at 4 words max.
+        - Splits precisely at `max_words` words max (default 4).
         - Breaks at punctuation.
+        - Breaks at speech pauses longer than `pause_threshold` seconds.
         - Force first segment to 0.0s.
         """
-        if not words:
-            return []
-
-        segments = []
-        current_group = []
-        
-        for i, word_data in enumerate(words):
-            current_group.append(word_data)
-            
-            # Conditions to break:
-            # 1. Reach 4 words (Strictly 2-4)
-            if len(current_group) >= 4:
-                break_condition = True
-            elif any(punc in word_data["word"] for punc in ['.', '?', '!']):
-                # 2. End of sentence
-                break_condition = True
-            elif i < len(words) - 1 and (words[i+1]["start"] - word_data["end"]) > 0.3:
-                # 3. Speech pause
-                break_condition = True
-            else:
-                break_condition = False
-            
-            if break_condition or i == len(words) - 1:
-                seg_text = " ".join([w["word"] for w in current_group]).strip()
-                segments.append({
-                    "start": round(current_group[0]["start"], 2),
-                    "end": round(current_group[-1]["end"], 2),
-                    "text": seg_text
-                })
-                current_group = []
-
-        # Zero-delay rule
-        if segments:
-            segments[0]["start"] = 0.0
-            
-        return segments
+        return words.group(max_words=max_words, pause_threshold=pause_threshold, break_punctuation=punctuation)
 
-    async def render_viral_video(self, input_video: str, segments: List[Dict[str, Any]], styles: Dict[str, Any]) -> str:
+    async def render_viral_video(self, input_video: str, segments: List[Dict[str, Any]], styles: Dict[str, Any],
+                                 profile: str = None) -> str:
         """
         Burns subtitles directly into video for download.
-        Uses SSA/ASS for advanced styling.
+        Uses SSA/ASS for advanced styling; `profile` selects an encode profile
+        (fast / balanced / small) from encode_profiles.
         """
+        encode = get_profile(profile)
+        width, height = encode["width"], encode["height"]
         unique_id = uuid.uuid4().hex[:8]
         ass_path = f"subs_{unique_id}.ass"
         output_video = f"export_{unique_id}.mp4"
         
-        # 1. Create ASS Subtitle File
-        color = styles.get('color', '#FFFFFF').replace('#', '&H00')
-        ass_color = "&H00FFFFFF" 
+        # 1. Create ASS Subtitle File (PlayRes matches the output frame)
+        style_line = self._ass_style(styles, width, height)
         
         with open(ass_path, "w", encoding='utf-8') as f:
-            f.write("[Script Info]\nScriptType: v4.00+\nPlayResX: 1080\nPlayResY: 1920\n\n")
+            f.write(f"[Script Info]\nScriptType: v4.00+\nPlayResX: {width}\nPlayResY: {height}\n\n")
             f.write("[V4+ Styles]\nFormat: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n")
-            f.write(f"Style: Default,Bebas Neue,80,{ass_color},&H000000FF,&H00000000,&H90000000,1,0,0,0,100,100,0,0,1,4,2,2,40,40,200,1\n\n")
+            f.write(f"{style_line}\n\n")
             f.write("[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
             
             for seg in segments:
@@ -209,9 +242,9 @@ class WhisperLargeV3Service:
         escaped_ass = ass_path.replace(":", "\\:").replace("\\", "/")
         cmd = [
             'ffmpeg', '-y', '-i', input_video,
-            '-vf', f"subtitles='{escaped_ass}'",
+            '-vf', video_filter(encode, escaped_ass),
+            *encoder_args(encode),
             '-c:a', 'copy',
-            '-preset', 'ultrafast',
             output_video
         ]
         
@@ -223,8 +256,37 @@ class WhisperLargeV3Service:
         await process.communicate()
         
         if os.path.exists(ass_path): os.remove(ass_path)
+        if not os.path.exists(output_video):
+            raise Exception("FFmpeg render failed.")
         return output_video
 
+    def _ass_style(self, styles: Dict[str, Any], width: int, height: int) -> str:
+        """
+        Maps editor styles (font, size, color, position) onto an ASS style line.
+        Editor sizes are preview pixels where 48 corresponds to 80 at 1920 high.
+        """
+        scale = height / 1920
+        font = (styles.get('font') or "Bebas Neue").split(',')[0].strip().strip("'\"")
+        try:
+            size = float(styles.get('size') or 48)
+        except (TypeError, ValueError):
+            size = 48.0
+        font_size = round(size * (80 / 48) * scale)
+
+        # '#RRGGBB' -> '&H00BBGGRR'
+        hex_color = (styles.get('color') or '#FFFFFF').lstrip('#')
+        if not re.fullmatch(r"[0-9a-fA-F]{6}", hex_color):
+            hex_color = "FFFFFF"
+        ass_color = f"&H00{hex_color[4:6]}{hex_color[2:4]}{hex_color[0:2]}".upper()
+
+        # Numpad-style alignment: 2 bottom, 5 middle, 8 top
+        alignment, margin_v = {"top": (8, 200), "center": (5, 0)}.get(styles.get('position'), (2, 200))
+        margin_h, margin_v = round(40 * scale), round(margin_v * scale)
+        outline, shadow = max(1, round(4 * scale)), max(1, round(2 * scale))
+
+        return (f"Style: Default,{font},{font_size},{ass_color},&H000000FF,&H00000000,&H90000000,"
+                f"1,0,0,0,100,100,0,0,1,{outline},{shadow},{alignment},{margin_h},{margin_h},{margin_v},1")
+
     def _format_ass_time(self, seconds: float) -> str:
         ms = int((seconds % 1) * 100)
         s = int(seconds % 60)
@@ -232,62 +294,122 @@ class WhisperLargeV3Service:
         h = int(seconds // 3600)
         return f"{h}:{m:02}:{s:02}.{ms:02}"
 
-    def post_process_captions(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        enhanced_words = []
-        emojis = ["🔥", "✨", "🎯", "⚡", "🚀", "🙌", "💥", "🎬"]
-        
-        for i, word_data in enumerate(words):
-            word = word_data["word"]
-            if i == 0 or (i > 0 and words[i-1]["word"].endswith(('.', '!', '?'))):
-                word = word.capitalize()
-            
-            if random.random() < 0.1:
-                word += f" {random.choice(emojis)}"
-            
-            enhanced_words.append({
-                **word_data,
-                "word": word
-            })
-        return enhanced_words
+    def post_process_captions(self, words: WordTimeline, emoji_rate: float = 0.1, seed: int = None) -> WordTimeline:
+        words = words.capitalize_sentences()
+        return words.sprinkle_emojis(rate=emoji_rate, seed=seed) if emoji_rate > 0 else words
+
+    def _response_meta(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        # The emoji seed is internal state for regroup, not part of the API
+        return {k: v for k, v in meta.items() if k != "emoji_seed"}
+
+    def regroup(self, transcript_id: str, max_words: int = 4, pause_threshold: float = 0.3,
+                punctuation=SENTENCE_PUNCTUATION, emoji_rate: float = 0.1) -> Dict[str, Any]:
+        """
+        Re-runs post-processing and grouping on a stored raw transcript.
+        No audio work happens here, so this returns in milliseconds.
+        """
+        raw_words, meta = transcript_store.load(transcript_id)
+        # Reuse the run's seed so only the requested parameters change, not emoji placement.
+        # Transcripts stored before seeds existed fall back to one derived from their id.
+        seed = meta.get("emoji_seed", int(transcript_id[:8], 16))
+        final_words = self.post_process_captions(raw_words, emoji_rate, seed)
+        return {
+            "status": "success",
+            "transcript_id": transcript_id,
+            "words": final_words,
+            "segments": self.group_words_virally(final_words, max_words, pause_threshold, punctuation),
+            **self._response_meta(meta)
+        }
 
-    async def process_video(self, video_path: str, language: str = None):
+    async def _transcribe_checkpointed(self, job_key: str, chunk_path: str, start: int,
+                                       language: str, task: str, model_size: str) -> Dict[str, Any]:
+        """Transcribes one chunk with up to `chunk_retries` retries and checkpoints the result."""
+        attempts = self.chunk_retries + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                result = await self.transcribe_chunk(chunk_path, float(start), language, task, model_size)
+                chunk_checkpoints.save(job_key, start, result)
+                return result
+            except Exception as e:
+                print(f"Chunk at {start}s failed (attempt {attempt}/{attempts}): {e}")
+                last_error = e
+        raise Exception(f"Chunk at {start}s failed after {attempts} attempts: {last_error}")
+
+    async def process_video(self, video_path: str, language: str = None, tier: str = "standard"):
         audio_path = None
+        chunk_paths = []
         try:
             audio_path = await self.preprocess_audio(video_path)
-            chunk_paths = await self.chunk_audio_ffmpeg(audio_path)
+            duration = await self.get_audio_duration(audio_path)
+
+            # Auto mode: detect once per media and pin language + task for every chunk.
+            # Detection runs on the fast model so routing can use the detected language.
+            detection = None
+            chunk_language, chunk_task = language, None
+            if not language or language == "auto":
+                detection = await self._pinned_language(video_path, audio_path, self.router.fast)
+                if detection:
+                    chunk_language, chunk_task = detection["language"], "transcribe"
+            model_size = self.router.select(duration, chunk_language, tier)
+
+            # Reuse chunks already finished by an earlier attempt of this job
+            job_key = chunk_checkpoints.job_key(
+                self.media_key(video_path),
+                language=chunk_language, task=chunk_task, model=model_size, chunk=self.chunk_length
+            )
+            starts = list(range(0, int(duration), self.chunk_length))
+            results = {start: chunk_checkpoints.load(job_key, start) for start in starts}
+            missing = [start for start in starts if results[start] is None]
+            if len(missing) < len(starts):
+                print(f"Resuming job {job_key[:8]}: {len(starts) - len(missing)}/{len(starts)} chunks checkpointed")
+
+            chunk_paths = await self.chunk_audio_ffmpeg(audio_path, self.chunk_length, starts=missing)
             
             tasks = []
-            for i, cp in enumerate(chunk_paths):
-                tasks.append(self.transcribe_chunk(cp, i * 30.0, language))
+            for start, cp in zip(missing, chunk_paths):
+                tasks.append(self._transcribe_checkpointed(job_key, cp, start, chunk_language, chunk_task, model_size))
             
-            results = await asyncio.gather(*tasks)
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+            failures = [o for o in outcomes if isinstance(o, Exception)]
+            if failures:
+                # Finished chunks stay checkpointed; the retry only redoes the failed ones
+                raise failures[0]
+            results.update(zip(missing, outcomes))
+            results = [results[start] for start in starts]
             
-            all_words = []
-            all_segments = []
-            detected_language = results[0]["language"] if results else "unknown"
-            language_prob = results[0]["language_prob"] if results else 0.0
+            if detection:
+                detected_language, language_prob = detection["language"], detection["language_prob"]
+            else:
+                detected_language = results[0]["language"] if results else "unknown"
+                language_prob = results[0]["language_prob"] if results else 0.0
             
-            for res in results:
-                all_words.extend(res["words"])
-                
-            final_words = self.post_process_captions(all_words)
+            all_words = WordTimeline.concat([res["words"] for res in results])
+            meta = {
+                "language": detected_language,
+                "language_probability": language_prob,
+                "model": f"whisper-{model_size}",
+                "emoji_seed": new_emoji_seed()
+            }
+            transcript_id = transcript_store.save(all_words, meta)
+            chunk_checkpoints.clear(job_key)
+
+            final_words = self.post_process_captions(all_words, seed=meta["emoji_seed"])
             viral_segments = self.group_words_virally(final_words)
             
             return {
                 "status": "success",
+                "transcript_id": transcript_id,
                 "words": final_words,
                 "segments": viral_segments,
-                "full_text": " ".join([w["word"] for w in final_words]),
-                "language": detected_language,
-                "language_probability": language_prob,
-                "model": "whisper-large-v3"
+                **self._response_meta(meta)
             }
         except Exception as e:
             print(f"Transcription Error: {e}")
             return {"status": "error", "message": str(e)}
         finally:
-            if audio_path and os.path.exists(audio_path):
-                try: os.remove(audio_path)
-                except: pass
+            for path in [audio_path, *chunk_paths]:
+                if path and os.path.exists(path):
+                    try: os.remove(path)
+                    except: pass
 
 transcription_service = WhisperLargeV3Service()
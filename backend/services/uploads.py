@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import datetime
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, Optional
+
+MAX_PART_BYTES = 32 * 1024 * 1024
+MAX_UPLOAD_BYTES = 4 * 1024 * 1024 * 1024
+# Received chunks are batched to this size before each write in the executor
+WRITE_BUFFER_BYTES = 1024 * 1024
+# Finalized files keep the client's extension only if it is a known video type,
+# so a name like "clip.json" can never land on the metadata sidecar's path
+VIDEO_SUFFIXES = {".mp4", ".m4v", ".mov", ".webm", ".mkv", ".avi", ".mpg", ".mpeg", ".3gp"}
+DEFAULT_SUFFIX = ".mp4"
+
+_DEFAULT_DIR = Path(__file__).resolve().parents[2] / "datastore" / "uploads"
+
+
+class UploadError(Exception):
+    """Protocol violation; `status_code` maps onto the HTTP response."""
+
+    def __init__(self, message: str, status_code: int = 400, offset: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.offset = offset
+
+
+class UploadService:
+    """
+    Resumable upload protocol:
+      1. create(filename, size)        -> upload_id
+      2. append(upload_id, offset, ..) -> new offset (one byte range per call)
+      3. status(upload_id)             -> current offset, to resume after a drop
+      4. finalize(upload_id)           -> path usable by caption/export jobs
+
+    Bytes go to <id>.part; a JSON sidecar records the committed offset and a
+    SHA-256 per part, so a restarted worker resumes from the last good part.
+    Unfinalized uploads idle for `stale_hours` and finalized ones older than
+    `retention_hours` are pruned.
+    """
+
+    def __init__(self, root: Path = _DEFAULT_DIR, stale_hours: float = 24, retention_hours: float = 72):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.stale_age = stale_hours * 3600
+        self.retention_age = retention_hours * 3600
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    # ---------------- PATHS ----------------
+    def _check_id(self, upload_id: str):
+        if not upload_id or not all(c in "0123456789abcdef" for c in upload_id):
+            raise UploadError("Upload not found", 404)
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.json"
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.part"
+
+    def _final_path(self, upload_id: str, meta: Dict[str, Any]) -> Path:
+        suffix = Path(meta["filename"]).suffix.lower()
+        return self.root / f"{upload_id}{suffix if suffix in VIDEO_SUFFIXES else DEFAULT_SUFFIX}"
+
+    def _read_meta(self, upload_id: str) -> Dict[str, Any]:
+        self._check_id(upload_id)
+        path = self._meta_path(upload_id)
+        if not path.exists():
+            raise UploadError("Upload not found", 404)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_meta(self, upload_id: str, meta: Dict[str, Any]):
+        # Write-then-rename so a crash never leaves a half-written sidecar
+        tmp = self._meta_path(upload_id).with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(upload_id))
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        if upload_id not in self._locks:
+            self._check_id(upload_id)
+            if not self._meta_path(upload_id).exists():
+                raise UploadError("Upload not found", 404)
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    def _open_part(self, upload_id: str, offset: int):
+        f = open(self._part_path(upload_id), "r+b")
+        # Drop any bytes from a part that was interrupted before being committed
+        f.truncate(offset)
+        f.seek(offset)
+        return f
+
+    @staticmethod
+    def _write_part(f, digest, data: bytes):
+        digest.update(data)
+        f.write(data)
+
+    # ---------------- PROTOCOL ----------------
+    def create(self, filename: str, size: int) -> Dict[str, Any]:
+        if size <= 0 or size > MAX_UPLOAD_BYTES:
+            raise UploadError(f"Upload size must be between 1 and {MAX_UPLOAD_BYTES} bytes")
+        upload_id = uuid.uuid4().hex
+        meta = {
+            "upload_id": upload_id,
+            "filename": os.path.basename(filename or "video.mp4"),
+            "size": size,
+            "offset": 0,
+            "parts": [],
+            "finalized": False,
+            "created_at": datetime.datetime.now().isoformat()
+        }
+        self._part_path(upload_id).touch()
+        self._write_meta(upload_id, meta)
+        self.prune()
+        return self._public(meta)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        return self._public(self._read_meta(upload_id))
+
+    async def append(self, upload_id: str, offset: int, stream: AsyncIterator[bytes],
+                     checksum: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Appends one byte range starting at `offset`, which must equal the committed
+        offset. If `checksum` (hex SHA-256) is given and doesn't match, the part is
+        rolled back and the client can resend it.
+        """
+        async with self._lock(upload_id):
+            meta = self._read_meta(upload_id)
+            if meta["finalized"]:
+                raise UploadError("Upload already finalized", 409, meta["offset"])
+            if offset != meta["offset"]:
+                raise UploadError("Offset mismatch", 409, meta["offset"])
+
+            loop = asyncio.get_running_loop()
+            digest = hashlib.sha256()
+            written = 0
+            # Disk I/O runs in the executor so slow storage doesn't stall other requests
+            f = await loop.run_in_executor(None, self._open_part, upload_id, offset)
+            try:
+                buffer = bytearray()
+                async for chunk in stream:
+                    written += len(chunk)
+                    if written > MAX_PART_BYTES or offset + written > meta["size"]:
+                        await loop.run_in_executor(None, f.truncate, offset)
+                        raise UploadError("Part exceeds the allowed size", 413, offset)
+                    buffer += chunk
+                    if len(buffer) >= WRITE_BUFFER_BYTES:
+                        await loop.run_in_executor(None, self._write_part, f, digest, bytes(buffer))
+                        buffer.clear()
+                if buffer:
+                    await loop.run_in_executor(None, self._write_part, f, digest, bytes(buffer))
+
+                if checksum and checksum.lower() != digest.hexdigest():
+                    await loop.run_in_executor(None, f.truncate, offset)
+                    raise UploadError("Part checksum mismatch", 422, offset)
+            finally:
+                await loop.run_in_executor(None, f.close)
+
+            if written:
+                meta["parts"].append({"offset": offset, "length": written, "sha256": digest.hexdigest()})
+                meta["offset"] = offset + written
+                self._write_meta(upload_id, meta)
+            return self._public(meta)
+
+    async def finalize(self, upload_id: str) -> Dict[str, Any]:
+        async with self._lock(upload_id):
+            meta = self._read_meta(upload_id)
+            if not meta["finalized"]:
+                if meta["offset"] != meta["size"]:
+                    raise UploadError("Upload incomplete", 409, meta["offset"])
+                os.replace(self._part_path(upload_id), self._final_path(upload_id, meta))
+                meta["finalized"] = True
+                self._write_meta(upload_id, meta)
+            return self._public(meta)
+
+    def resolve(self, upload_id: str) -> str:
+        """Path of a finalized upload, for caption/export jobs."""
+        meta = self._read_meta(upload_id)
+        if not meta["finalized"]:
+            raise UploadError("Upload not finalized", 409, meta["offset"])
+        return str(self._final_path(upload_id, meta))
+
+    async def delete(self, upload_id: str):
+        # Under the upload's lock so a delete never lands in the middle of a part
+        async with self._lock(upload_id):
+            self._remove(upload_id, self._read_meta(upload_id))
+
+    def _remove(self, upload_id: str, meta: Dict[str, Any]):
+        for path in (self._part_path(upload_id), self._final_path(upload_id, meta), self._meta_path(upload_id)):
+            if path.exists():
+                path.unlink()
+        self._locks.pop(upload_id, None)
+
+    def prune(self):
+        now = time.time()
+        for meta_path in self.root.glob("*.json"):
+            upload_id = meta_path.stem
+            lock = self._locks.get(upload_id)
+            if lock is not None and lock.locked():
+                continue
+            try:
+                meta = self._read_meta(upload_id)
+                # The sidecar is rewritten on every committed part, so its mtime is the last activity
+                last_activity = meta_path.stat().st_mtime
+                if self._part_path(upload_id).exists():
+                    last_activity = max(last_activity, self._part_path(upload_id).stat().st_mtime)
+                max_age = self.retention_age if meta["finalized"] else self.stale_age
+                if now - last_activity > max_age:
+                    self._remove(upload_id, meta)
+            except (UploadError, FileNotFoundError, ValueError, KeyError):
+                continue
+        # Lock entries for ids whose files are gone (deleted, pruned or never created)
+        for upload_id in [u for u, lock in self._locks.items() if not lock.locked()]:
+            if not self._meta_path(upload_id).exists():
+                self._locks.pop(upload_id, None)
+
+    def _public(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "upload_id": meta["upload_id"],
+            "filename": meta["filename"],
+            "size": meta["size"],
+            "offset": meta["offset"],
+            "parts": len(meta["parts"]),
+            "finalized": meta["finalized"]
+        }
+
+
+uploads = UploadService()
@@ -4,7 +4,6 @@ import gspread
 import datetime
 from pathlib import Path
 from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
 
 # --- Environment Configuration ---
 _backend_dir = Path(__file__).resolve().parent
@@ -20,18 +19,20 @@ for loc in _env_locations:
         _env_loaded = True
         break
 
+# Imported after the env is loaded so the shared client sees the creds path
+from backend.services.google_client import google_api
+
 # ===================== GOOGLE SHEETS DB =====================
 
 class SheetsDB:
-    def __init__(self):
-        self.scope = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ]
+    """
+    Google Sheets persistence on top of the shared `google_api` client.
+    Public methods are coroutines: every Sheets call runs on the shared thread
+    pool so a slow API never blocks the event loop.
+    """
 
-        self.creds_path = Path(
-            os.getenv("GOOGLE_SHEETS_CREDS_PATH", "/etc/secrets/credentials.json")
-        )
+    def __init__(self):
+        self.creds_path = google_api.creds_path
 
         self.client = None
         self.spreadsheet = None
@@ -44,23 +45,18 @@ class SheetsDB:
 
     def _connect(self):
         try:
-            if not self.creds_path.exists():
+            if not google_api.has_credentials():
                 print(f"⚠️ Google Sheets creds not found at {self.creds_path}")
                 return  # graceful fallback
 
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                str(self.creds_path), self.scope
-            )
-
-            self.client = gspread.authorize(creds)
-
             sheet_id = os.getenv("GOOGLE_SHEET_ID")
             if not sheet_id:
                 print("⚠️ GOOGLE_SHEET_ID not set")
                 return
 
-            self.spreadsheet = self.client.open_by_key(sheet_id)
-            self._ensure_sheets_exist()
+            self.client = google_api.run(google_api.gspread_client)
+            self.spreadsheet = google_api.run(self.client.open_by_key, sheet_id)
+            google_api.run(self._ensure_sheets_exist)
 
             self._connected = True
             print(f"✅ Connected to Google Sheets: {self.spreadsheet.title}")
@@ -98,49 +94,51 @@ class SheetsDB:
             )
 
     # ---------------- USERS ----------------
-    def store_user(self, user_data):
+    async def store_user(self, user_data):
         """Updates or creates a user row in Google Sheets"""
         if not self.is_connected():
             return False
 
         try:
-            email = user_data.get("email")
-            if not email: return False
-
-            name = user_data.get("name", "")
-            country = user_data.get("country", "")
-            user_id = user_data.get("user_id", "")
-            timestamp = user_data.get("created_at") or datetime.datetime.now().isoformat()
-
-            # Search only in email column (Column C)
-            emails = self.user_sheet.col_values(3)
-
-            if email in emails:
-                row = emails.index(email) + 1
-                self.user_sheet.update(
-                    f"A{row}:E{row}",
-                    [[user_id, name, email, country, timestamp]]
-                )
-                print(f"Updated user in sheet: {email}")
-                return "updated"
-            else:
-                self.user_sheet.append_row([user_id, name, email, country, timestamp])
-                print(f"Created new user in sheet: {email}")
-                return "created"
-                
+            return await google_api.call(self._store_user, user_data)
         except Exception as e:
             print(f"Error storing user to Sheets: {e}")
             return False
 
+    def _store_user(self, user_data):
+        email = user_data.get("email")
+        if not email: return False
+
+        name = user_data.get("name", "")
+        country = user_data.get("country", "")
+        user_id = user_data.get("user_id", "")
+        timestamp = user_data.get("created_at") or datetime.datetime.now().isoformat()
+
+        # Search only in email column (Column C)
+        emails = self.user_sheet.col_values(3)
+
+        if email in emails:
+            row = emails.index(email) + 1
+            self.user_sheet.update(
+                f"A{row}:E{row}",
+                [[user_id, name, email, country, timestamp]]
+            )
+            print(f"Updated user in sheet: {email}")
+            return "updated"
+        else:
+            self.user_sheet.append_row([user_id, name, email, country, timestamp])
+            print(f"Created new user in sheet: {email}")
+            return "created"
+
     # ---------------- FEEDBACK ----------------
-    def store_feedback(self, feedback_data):
+    async def store_feedback(self, feedback_data):
         """Appends a feedback entry to Google Sheets"""
         if not self.is_connected():
             return False
 
         try:
             timestamp = datetime.datetime.now().isoformat()
-            self.feedback_sheet.append_row([
+            await google_api.call(self.feedback_sheet.append_row, [
                 feedback_data.get("user_id", "Anonymous"),
                 feedback_data.get("email", ""),
                 feedback_data.get("rating"),
@@ -155,25 +153,28 @@ class SheetsDB:
             print(f"Error storing feedback: {e}")
             return False
 
-    def get_user_by_email(self, email):
+    async def get_user_by_email(self, email):
         """Helper for main app lookup"""
         if not self.is_connected(): return None
         try:
-            emails = self.user_sheet.col_values(3)
-            if email in emails:
-                row_idx = emails.index(email) + 1
-                row = self.user_sheet.row_values(row_idx)
-                if len(row) >= 3:
-                    return {
-                        "user_id": row[0],
-                        "name": row[1],
-                        "email": row[2],
-                        "country": row[3] if len(row) > 3 else "",
-                    }
-            return None
+            return await google_api.call(self._get_user_by_email, email)
         except Exception:
             return None
 
+    def _get_user_by_email(self, email):
+        emails = self.user_sheet.col_values(3)
+        if email in emails:
+            row_idx = emails.index(email) + 1
+            row = self.user_sheet.row_values(row_idx)
+            if len(row) >= 3:
+                return {
+                    "user_id": row[0],
+                    "name": row[1],
+                    "email": row[2],
+                    "country": row[3] if len(row) > 3 else "",
+                }
+        return None
+
 
 # ===================== LOCAL JSON DB =====================
 
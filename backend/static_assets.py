@@ -0,0 +1,124 @@
+import re
+import gzip
+import hashlib
+import mimetypes
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from backend.services.http_negotiation import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip-only without it
+    brotli = None
+
+COMPRESSIBLE = {".html", ".js", ".css", ".svg", ".json", ".txt", ".map"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+class Asset:
+    def __init__(self, body: bytes, media_type: str, compress: bool):
+        self.media_type = media_type
+        self.variants: Dict[str, bytes] = {"identity": body}
+        if compress:
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gz) < len(body):
+                self.variants["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(body, quality=11)
+                if len(br) < len(body):
+                    self.variants["br"] = br
+        # Each content-coding is a different representation, so each gets its own strong ETag
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        self.etags: Dict[str, str] = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.variants
+        }
+
+
+def _if_none_match(header: Optional[str]) -> Set[str]:
+    """Entity tags from If-None-Match; weak validators compare by their opaque tag."""
+    tags = set()
+    for tag in (header or "").split(","):
+        tag = tag.strip()
+        tags.add(tag[2:] if tag.startswith("W/") else tag)
+    tags.discard("")
+    return tags
+
+
+class StaticAssets:
+    """
+    In-memory, precompressed frontend assets, built once at startup:
+      - every file gets a content-hashed alias (script.js -> script.<hash>.js)
+        served with an immutable, year-long Cache-Control
+      - HTML entry points are rewritten to reference the hashed URLs and are
+        served with an ETag + no-cache so browsers revalidate with a cheap 304
+      - text assets are stored pre-gzipped (and brotli'd when available); the
+        best variant is picked per request from Accept-Encoding
+    """
+
+    def __init__(self, root: Path, url_prefix: str = "/static"):
+        self.root = Path(root)
+        self.url_prefix = url_prefix
+        self.assets: Dict[str, Asset] = {}
+        self.hashed: Dict[str, str] = {}  # hashed name -> original name
+        self.pages: Dict[str, Asset] = {}
+        self.build()
+
+    def build(self):
+        urls = {}
+        for path in sorted(p for p in self.root.rglob("*") if p.is_file()):
+            name = path.relative_to(self.root).as_posix()
+            body = path.read_bytes()
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            asset = Asset(body, media_type, path.suffix.lower() in COMPRESSIBLE)
+            self.assets[name] = asset
+
+            digest = hashlib.sha256(body).hexdigest()[:10]
+            hashed_name = str(Path(name).with_name(f"{path.stem}.{digest}{path.suffix}").as_posix())
+            self.hashed[hashed_name] = name
+            urls[f"{self.url_prefix}/{name}"] = f"{self.url_prefix}/{hashed_name}"
+
+        pattern = re.compile("|".join(re.escape(u) for u in sorted(urls, key=len, reverse=True))) if urls else None
+        for name in [n for n in self.assets if n.endswith(".html")]:
+            html = (self.root / name).read_text(encoding="utf-8")
+            if pattern:
+                html = pattern.sub(lambda m: urls[m.group(0)], html)
+            self.pages[name] = Asset(html.encode("utf-8"), "text/html; charset=utf-8", True)
+
+    def _respond(self, request: Request, asset: Asset, cache_control: str) -> Response:
+        accepted = accepted_encodings(request.headers.get("accept-encoding"))
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in asset.variants and accepted.get(candidate, 0) > 0:
+                encoding = candidate
+                break
+
+        headers = {"ETag": asset.etags[encoding], "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        # A cached copy in any coding is still current, since all codings share one source
+        cached = _if_none_match(request.headers.get("if-none-match"))
+        if "*" in cached or cached & set(asset.etags.values()):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        body = asset.variants[encoding]
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            return Response(media_type=asset.media_type, headers=headers)
+        return Response(content=body, media_type=asset.media_type, headers=headers)
+
+    def page(self, request: Request, name: str) -> Response:
+        return self._respond(request, self.pages[name], REVALIDATE)
+
+    def asset(self, request: Request, name: str) -> Optional[Response]:
+        """Hashed names are immutable; plain names (e.g. from JS/CSS) revalidate via ETag."""
+        if name in self.hashed:
+            return self._respond(request, self.assets[self.hashed[name]], IMMUTABLE)
+        if name in self.assets:
+            return self._respond(request, self.assets[name], REVALIDATE)
+        return None
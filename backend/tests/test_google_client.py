@@ -0,0 +1,152 @@
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+pytest.importorskip("gspread")
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from backend.services.google_client import GoogleAPIClient, CircuitBreaker, CircuitOpenError
+
+SHEETS_API = "https://sheets.googleapis.com"
+
+
+class _FakeGoogle(BaseHTTPRequestHandler):
+    """Token endpoint plus the one Sheets call gspread makes when opening a spreadsheet."""
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, body, status=200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        state = self.server.state
+        state["token_requests"] += 1
+        self._json({"access_token": f"tok-{state['token_requests']}", "expires_in": 3600, "token_type": "Bearer"})
+
+    def do_GET(self):
+        self.server.state["auth_headers"].append(self.headers.get("Authorization"))
+        spreadsheet_id = self.path.split("?")[0].rsplit("/", 1)[-1]
+        if spreadsheet_id == "slow":
+            time.sleep(2)
+        self._json({
+            "spreadsheetId": spreadsheet_id,
+            "properties": {"title": "Captions"},
+            "sheets": [{"properties": {"sheetId": 0, "title": "Sheet1", "index": 0}}],
+        })
+
+
+class _RedirectAdapter(requests.adapters.HTTPAdapter):
+    """Sends requests for the real Sheets host to the fake server instead."""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        request.url = request.url.replace(SHEETS_API, self.base_url, 1)
+        return super().send(request, **kwargs)
+
+
+@pytest.fixture
+def fake_google():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeGoogle)
+    server.state = {"token_requests": 0, "auth_headers": []}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", server.state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch, fake_google):
+    base_url, _ = fake_google
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    creds_path = tmp_path / "credentials.json"
+    creds_path.write_text(json.dumps({
+        "type": "service_account",
+        "project_id": "test",
+        "private_key_id": "test-key",
+        "private_key": pem,
+        "client_email": "captions@test.iam.gserviceaccount.com",
+        "client_id": "1",
+        "token_uri": f"{base_url}/token",
+    }))
+    monkeypatch.setenv("GOOGLE_SHEETS_CREDS_PATH", str(creds_path))
+    monkeypatch.setenv("GOOGLE_API_TIMEOUT", "0.5")
+    return GoogleAPIClient()
+
+
+def _open(api, fake_google, spreadsheet_id):
+    client = api.gspread_client()
+    api._session.mount(SHEETS_API, _RedirectAdapter(fake_google[0]))
+    return client.open_by_key(spreadsheet_id)
+
+
+def test_gspread_client_uses_shared_session(api, fake_google):
+    _, state = fake_google
+    spreadsheet = _open(api, fake_google, "abc123")
+
+    assert spreadsheet.title == "Captions"
+    assert api.gspread_client() is api.gspread_client()
+    assert state["token_requests"] == 1
+    assert state["auth_headers"] == ["Bearer tok-1"]
+
+
+def test_session_applies_default_timeout(api, fake_google):
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.Timeout):
+        _open(api, fake_google, "slow")
+    assert time.monotonic() - started < 2
+
+
+def test_call_times_out_and_records_failure(api):
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(api.call(time.sleep, 1, timeout=0.1))
+    assert api.breaker.failures == 1
+
+
+def test_breaker_opens_then_recovers_through_single_trial(api):
+    api.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            api.run(failing)
+    assert api.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        api.run(failing)
+    assert len(calls) == 2
+
+    time.sleep(0.25)
+    assert api.breaker.state == "half-open"
+    api.breaker.before_call()
+    # Only one trial call is let through while half-open
+    with pytest.raises(CircuitOpenError):
+        api.breaker.before_call()
+    api.breaker.record_success()
+
+    assert api.breaker.state == "closed"
+    assert api.run(lambda: "ok") == "ok"